@@ -19,7 +19,7 @@ class TraineeController:
         """
         try:
             service = TraineeService(trainee)
-            result = service.create_trainee_services()
+            result = await service.create_trainee_services()
             return TraineeResponse(**result)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
@@ -31,7 +31,7 @@ class TraineeController:
         try:
        
             service = TraineeService(trainee)
-            result = service.create_trainee_services()
+            result = await service.create_trainee_services()
         
             # If successful and not a mock user, send welcome email
             if result.get('success') and not trainee.config.is_mock:
@@ -1,17 +1,64 @@
+import asyncio
+import hashlib
+import time
 from typing import Dict, Optional
 from fastapi import HTTPException, Security, Depends, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-import httpx
 
 from review_scripts.communication_manager import CommunicationManager
-from review_scripts.strapi_graphql import StrapiGraphql
+from review_scripts.strapi_clients import get_async_auth_client
+from review_scripts.strapi_errors import StrapiError, StrapiTransientError
 from api.core.logging_config import setup_logging
-from api.core.config import Settings
+from api.core.config import Settings, get_settings, get_strapi_params
+from review_scripts.strapi_cache import TTLCache
 from api.models.trainee import TraineeResponse
+from utils.secret import get_auth, lambda_friendly_path
+
+try:
+    from jose import jwt, JWTError
+except ImportError:  # only needed for AUTH_MODE=jwt
+    jwt = None
 
 logger = setup_logging()
 security = HTTPBearer()
 
+# validated identities (and rejections) per token hash and Strapi root
+_token_cache = TTLCache(get_settings().AUTH_CACHE_TTL, get_settings().AUTH_CACHE_MAXSIZE)
+# AUTH_MODE=jwt: user id -> identity (id, email, username, role) per Strapi root
+_identity_cache = TTLCache(get_settings().AUTH_IDENTITY_TTL, get_settings().AUTH_CACHE_MAXSIZE)
+
+RUN_STAGE_HEADER = "X-Run-Stage"
+
+
+def run_stage_hint(request: Request) -> Optional[str]:
+    """run_stage from the X-Run-Stage header or the `run_stage` query parameter"""
+    return request.headers.get(RUN_STAGE_HEADER) or request.query_params.get("run_stage")
+
+
+async def resolve_run_stage(request: Request) -> Optional[str]:
+    """
+    Find the run_stage a request targets.
+
+    The X-Run-Stage header or a `run_stage` query parameter is used when
+    present, so the body is never touched. Otherwise the stage is read from
+    the body through Starlette's cached request.form() / request.json(),
+    which the route handler's Form / Body parameters share.
+    """
+    run_stage = run_stage_hint(request)
+    if run_stage:
+        return run_stage
+
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "multipart/form-data" in content_type or "application/x-www-form-urlencoded" in content_type:
+            form_data = await request.form()
+            return form_data.get("run_stage")
+        # For JSON and other content types
+        json_data = await request.json()
+        return json_data.get("config", {}).get("run_stage")
+    except:
+        return "dev"  # Default to dev if can't get from request
+
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Security(security)
@@ -37,75 +84,165 @@ async def get_current_user(
     for name, value in request.query_params.items():
         print(f"  {name}: {value}")
 
-    # First check content type
-    content_type = request.headers.get("content-type", "")
-    print(f"\nContent-Type: {content_type}")
-    
-    try:
-        if "multipart/form-data" in content_type:
-            form_data = await request.form()
-            run_stage = form_data.get("run_stage")
-        else:
-            # For JSON and other content types
-            json_data = await request.json()
-            run_stage = json_data.get("config", {}).get("run_stage")
-    except:
-        run_stage = "dev"  # Default to dev if can't get from request
-    
-    sg = StrapiGraphql(run_stage=run_stage)
-    strapi_url = sg.apiroot
+    print(f"\nContent-Type: {request.headers.get('content-type', '')}")
+
+    run_stage = await resolve_run_stage(request)
+    # own limiter and breaker: token checks do not queue behind or trip on data traffic
+    client = get_async_auth_client(run_stage)
+    strapi_url = client.apiroot
     logger.info("Used Strapi URL.....: %s", strapi_url)
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+    key = ('auth', strapi_url, hashlib.sha256(token.encode('utf-8')).hexdigest())
+    found, identity = _token_cache.get(key)
+    if found:
+        return identity
+
+    if get_settings().AUTH_MODE == "jwt":
+        identity, ttl = await _verify_jwt(client, token)
+    else:
+        identity, ttl = await _validate_token(client, token)
+    if ttl:
+        _token_cache.set(key, identity, ttl)
+    return identity
+
+
+# Strapi root -> JWT secret, filled by the startup warm-up or on first use
+_jwt_secrets = {}
+
+
+def get_jwt_secret(run_stage: str) -> str:
+    """
+    JWT secret of a stage's Strapi deployment (users-permissions jwtSecret).
+
+    Stored next to its API token (TENX_PROD_STRAPI_TOKEN -> TENX_PROD_STRAPI_JWT_SECRET)
+    and cached in .env/{root}_jwt.json like the token is in .env/{root}.json.
+    Blocking on first use; raises when it cannot be found, so a failed lookup
+    is retried next time.
+    """
+    root, ssmkey = get_strapi_params(run_stage)
+    secret = _jwt_secrets.get(root)
+    if secret is None:
+        secret = get_auth(ssmkey.replace('_TOKEN', '_JWT_SECRET'), envvar='STRAPI_JWT_SECRET',
+                          fconfig=lambda_friendly_path(f'.env/{root}_jwt.json'))
+        if not secret:
+            raise ValueError(f"No JWT secret configured for {root}")
+        _jwt_secrets[root] = secret
+    return secret
+
+
+async def _verify_jwt(client, token: str):
+    """
+    AUTH_MODE=jwt: check the token's signature and expiry locally and take
+    the identity from the user id cache, falling back to the `me` query
+    (which fills the cache) for ids not seen yet.
+
+    Falls back to _validate_token when python-jose or the secret is missing.
+
+    Returns:
+        tuple: (user dict or error response, seconds to cache it), never
+        longer than the token has left to live
+    """
+    settings = get_settings()
+    try:
+        if jwt is None:
+            raise ImportError("python-jose is not installed")
+        secret = _jwt_secrets.get(get_strapi_params(client.run_stage)[0])
+        if secret is None:
+            # not prefetched at startup: resolve it off the event loop
+            secret = await asyncio.to_thread(get_jwt_secret, client.run_stage)
+    except Exception as e:
+        print(f"Local JWT verification unavailable ({str(e)}), validating with Strapi")
+        return await _validate_token(client, token)
+
+    try:
+        claims = jwt.decode(token, secret, algorithms=settings.AUTH_JWT_ALGORITHMS)
+    except JWTError as e:
+        return TraineeResponse.error_response(
+            error_type="AUTH_ERROR",
+            error_message="Invalid authentication credentials",
+            error_location="token_validation",
+            error_data={"status_code": 401, "reason": str(e)}
+        ), settings.AUTH_NEGATIVE_CACHE_TTL
+
+    ttl = settings.AUTH_CACHE_TTL
+    if claims.get("exp"):
+        ttl = min(ttl, claims["exp"] - time.time())
+
+    user_id = str(claims.get("id"))
+    key = ('identity', client.apiroot, user_id)
+    found, identity = _identity_cache.get(key)
+    if found:
+        return identity, ttl
+
+    identity, me_ttl = await _validate_token(client, token)
+    if identity.get("id") == user_id:
+        _identity_cache.set(key, identity)
+        return identity, ttl
+    return identity, me_ttl
+
+
+async def _validate_token(client, token: str):
+    """
+    Run the Strapi `me` query for a token.
+
+    Returns:
+        tuple: (user dict or error response, seconds to cache it). Valid
+        identities get AUTH_CACHE_TTL, rejected tokens AUTH_NEGATIVE_CACHE_TTL
+        and failures to reach Strapi are not cached (ttl None).
+    """
+    settings = get_settings()
     cm = CommunicationManager()
     auth_query = cm.request_auth_query()
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(strapi_url, headers=headers, json={"query": auth_query})
-            if response.status_code == 200:
-                auth_data = response.json()
-                
-                print("Authentication response:", auth_data)
-                
-                if auth_data and "data" in auth_data and "me" in auth_data["data"]:
-                    user_data = auth_data["data"]["me"]
-                    print("User data:", user_data)
-
-                    # Extract user info
-                    uid = user_data.get("id", "")
-                    username = user_data.get("username", "")
-                    email = user_data.get("email", "")
-                    
-                    # Extract role
-                    role_data = user_data.get("role", {})
-                    role = role_data.get("name", "user") if isinstance(role_data, dict) else "user"
-                    print(f"Extracted role: {role}")
-    
-                    return {
-                        "id": str(user_data.get("id")),
-                        "email": user_data.get("email"),
-                        "username": user_data.get("username"),
-                        "role": role
-                    }
-                else:
-                    return TraineeResponse.error_response(
-                        error_type="AUTH_ERROR",
-                        error_message="Invalid authentication data",
-                        error_location="token_validation",
-                        error_data={"response": auth_data}
-                    )
-            else:
-                return TraineeResponse.error_response(
-                    error_type="AUTH_ERROR",
-                    error_message="Invalid authentication credentials",
-                    error_location="token_validation",
-                    error_data={"status_code": response.status_code}
-                )
-                
+        # concurrent requests with the same token share one `me` call
+        auth_data = await client.execute(auth_query, token=token)
+        print("Authentication response:", auth_data)
+        
+        if auth_data and "data" in auth_data and auth_data["data"].get("me"):
+            user_data = auth_data["data"]["me"]
+            print("User data:", user_data)
+
+            # Extract role
+            role_data = user_data.get("role", {})
+            role = role_data.get("name", "user") if isinstance(role_data, dict) else "user"
+            print(f"Extracted role: {role}")
+
+            return {
+                "id": str(user_data.get("id")),
+                "email": user_data.get("email"),
+                "username": user_data.get("username"),
+                "role": role
+            }, settings.AUTH_CACHE_TTL
+        else:
+            return TraineeResponse.error_response(
+                error_type="AUTH_ERROR",
+                error_message="Invalid authentication data",
+                error_location="token_validation",
+                error_data={"response": auth_data}
+            ), settings.AUTH_NEGATIVE_CACHE_TTL
+    except StrapiTransientError as e:
+        print(f"Strapi unavailable during authentication: {str(e)}")
+        return TraineeResponse.error_response(
+            error_type="AUTH_ERROR",
+            error_message="Failed to validate authentication token",
+            error_location="token_validation",
+            error_data={"exception": str(e)}
+        ), None
+    except StrapiError as e:
+        if e.status_code != 200:
+            return TraineeResponse.error_response(
+                error_type="AUTH_ERROR",
+                error_message="Invalid authentication credentials",
+                error_location="token_validation",
+                error_data={"status_code": e.status_code}
+            ), settings.AUTH_NEGATIVE_CACHE_TTL
+        return TraineeResponse.error_response(
+            error_type="AUTH_ERROR",
+            error_message="Invalid authentication data",
+            error_location="token_validation",
+            error_data={"response": e.details}
+        ), settings.AUTH_NEGATIVE_CACHE_TTL
     except Exception as e:
         print(f"Exception during authentication: {str(e)}")
         return TraineeResponse.error_response(
@@ -113,7 +250,7 @@ async def get_current_user(
             error_message="Failed to validate authentication token",
             error_location="token_validation",
             error_data={"exception": str(e)}
-        )
+        ), None
 
 async def verify_admin_access(
     current_user: Dict = Depends(get_current_user)
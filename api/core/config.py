@@ -15,6 +15,90 @@ class Settings(BaseSettings):
     DEFAULT_ROLE: str = "trainee"
     DEFAULT_BATCH_SIZE: int = 20
     
+    # Strapi HTTP connection pool
+    STRAPI_POOL_CONNECTIONS: int = 10
+    STRAPI_POOL_MAXSIZE: int = 20
+    STRAPI_CONNECT_TIMEOUT: float = 5.0
+    STRAPI_READ_TIMEOUT: float = 60.0
+    STRAPI_MUTATION_BATCH_SIZE: int = 25  # aliased mutations per request
+    STRAPI_PAGE_SIZE: int = 100  # records per page for collection reads
+    STRAPI_PAGE_CONCURRENCY: int = 4  # pages fetched in parallel
+    STRAPI_INSERT_CONCURRENCY: int = 8  # parallel REST inserts in StrapiMethods.insert_many
+    
+    # Strapi rate limiting (per stage, shared by every client)
+    STRAPI_RATE_LIMIT: float = 20.0  # starting requests per second
+    STRAPI_RATE_CEILING: Optional[float] = None  # highest rate additive increase may reach, defaults to STRAPI_RATE_LIMIT
+    STRAPI_RATE_BURST: int = 20
+    STRAPI_THROTTLE_RETRIES: int = 5  # retries on 429/503
+    STRAPI_THROTTLE_BACKOFF: float = 1.0  # seconds, when no Retry-After is sent
+    
+    # Strapi retries and circuit breaker
+    STRAPI_RETRY_ATTEMPTS: int = 3  # retries of reads / unsent calls on transient errors
+    STRAPI_RETRY_BACKOFF: float = 0.5  # base of the jittered exponential backoff (seconds)
+    STRAPI_RETRY_MAX_BACKOFF: float = 8.0
+    STRAPI_BREAKER_THRESHOLD: int = 5  # consecutive failed calls before the circuit opens
+    STRAPI_BREAKER_RESET: float = 30.0  # seconds before a probe call is allowed
+    
+    # In-process cache for batch / reviewer lookups
+    STRAPI_CACHE_TTL: float = 300.0  # seconds
+    STRAPI_CACHE_MAXSIZE: int = 1024
+    
+    # Send graphql documents as automatic persisted queries (sha256 first, text on a miss)
+    STRAPI_PERSISTED_QUERIES: bool = True
+    
+    # Request body compression ("gzip", "br" or "" to disable) above a size threshold
+    STRAPI_REQUEST_ENCODING: str = "gzip"
+    STRAPI_COMPRESS_MIN_BYTES: int = 4096
+    
+    # Validated admin tokens (get_current_user), keyed by sha256(token) + Strapi root
+    AUTH_CACHE_TTL: float = 60.0  # seconds a valid identity is reused
+    AUTH_NEGATIVE_CACHE_TTL: float = 10.0  # seconds an invalid token is rejected without asking Strapi
+    AUTH_CACHE_MAXSIZE: int = 1024
+    # "strapi" validates every new token with the me query; "jwt" verifies
+    # users-permissions JWTs locally and asks me only for unknown user ids
+    AUTH_MODE: str = "strapi"
+    AUTH_JWT_ALGORITHMS: list[str] = ["HS256"]
+    AUTH_IDENTITY_TTL: float = 900.0  # seconds a user id -> identity entry is reused in jwt mode
+    
+    # HMAC-signed service requests (api.core.security.verify_service_signature)
+    SERVICE_KEYS_SSMKEY: str = "SERVICE_API_KEYS"  # key id -> secret (or {"secret", "email"})
+    SERVICE_AUTH_MAX_SKEW: float = 300.0  # seconds a signed request's timestamp may be off
+    # where accepted signatures are remembered (api.services.replay_store): "sqlite" (JOB_STORE_PATH,
+    # shared by the workers of one host), "redis" (JOB_QUEUE_URL, any host) or "memory" (one worker only)
+    SERVICE_REPLAY_BACKEND: str = "sqlite"
+    SERVICE_REPLAY_CACHE_MAXSIZE: int = 10000  # memory backend only
+    
+    # Webhook deliveries (shared client from api.core.http_clients)
+    WEBHOOK_TIMEOUT: float = 30.0
+    WEBHOOK_POOL_MAXSIZE: int = 10
+    WEBHOOK_KEEPALIVE_EXPIRY: float = 30.0
+    
+    # Upper bound on rows BatchService creates concurrently (BatchConfig.concurrency / chunk_size)
+    BATCH_MAX_CONCURRENCY: int = 50
+    
+    # Batch job progress store (api.services.job_store)
+    JOB_STORE_BACKEND: str = "sqlite"
+    JOB_STORE_PATH: str = "data/batch_jobs.sqlite3"
+    JOB_PROGRESS_BATCH: int = 50  # finished rows written to the store in one transaction
+    JOB_PROGRESS_INTERVAL: float = 1.0  # seconds before buffered rows are written anyway
+    
+    # Where batch jobs run: "inline" in the API process (BackgroundTasks) or
+    # "queue" for `python -m api.worker` processes (api.services.job_queue)
+    JOB_EXECUTOR: str = "inline"
+    JOB_QUEUE_BACKEND: str = "sqlite"  # or "redis"
+    JOB_QUEUE_PATH: Optional[str] = None  # sqlite file, defaults to JOB_STORE_PATH
+    JOB_QUEUE_URL: str = "redis://localhost:6379/0"
+    JOB_WORKER_CONCURRENCY: int = 2  # jobs per worker process
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_LEASE_TIMEOUT: float = 60.0  # seconds without heartbeat before a job is requeued
+    JOB_MAX_ATTEMPTS: int = 3
+    
+    # Startup warm-up (api.core.warmup): resolve stage tokens and Google credentials
+    STARTUP_PREFETCH: bool = True
+    PREFETCH_STAGES: list[str] = ["dev", "prod", "devapply", "apply", "devu2j", "u2j", "kaim",
+                                  "kepler", "tenacious", "simulation", "demo"]
+    PREFETCH_TIMEOUT: float = 30.0
+    
     # File processing
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_FILE_TYPES: list[str] = ["text/csv"]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
+
+from api.core.config import get_settings
+from api.core.warmup import warm_up
+from review_scripts import strapi_metrics
+from review_scripts.strapi_async import close_async_http_clients
+from review_scripts.strapi_session import close_strapi_sessions
+
+logger = logging.getLogger(__name__)
+
+# outbound (non-Strapi) client for webhook deliveries, bound to one event loop
+_webhook_client = None
+
+
+def get_webhook_client() -> httpx.AsyncClient:
+    """
+    Return the shared httpx.AsyncClient used for webhook deliveries.
+
+    The app creates it in its lifespan; callers outside the app (scripts,
+    background jobs) get one lazily, replaced when the running loop changes.
+    """
+    global _webhook_client
+    loop = asyncio.get_running_loop()
+    if _webhook_client is None or _webhook_client[0] is not loop or _webhook_client[1].is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.WEBHOOK_TIMEOUT,
+                                  connect=settings.STRAPI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=settings.WEBHOOK_POOL_MAXSIZE,
+                                max_keepalive_connections=settings.WEBHOOK_POOL_MAXSIZE,
+                                keepalive_expiry=settings.WEBHOOK_KEEPALIVE_EXPIRY),
+        )
+        _webhook_client = (loop, client)
+    return _webhook_client[1]
+
+
+def webhook_client(request: Request) -> httpx.AsyncClient:
+    """FastAPI dependency: the lifespan-managed webhook client"""
+    client = getattr(request.app.state, 'webhook_client', None)
+    if client is None or client.is_closed:
+        client = get_webhook_client()
+    return client
+
+
+async def close_http_clients():
+    """Close the webhook client, the async Strapi clients and the pooled Strapi sessions"""
+    global _webhook_client
+    entry, _webhook_client = _webhook_client, None
+    if entry is not None and not entry[1].is_closed:
+        await entry[1].aclose()
+    await close_async_http_clients()
+    close_strapi_sessions()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared outbound clients and prefetch credentials on startup,
+    log the Strapi client metrics and close the clients on shutdown
+    """
+    app.state.webhook_client = get_webhook_client()
+    await warm_up()
+    try:
+        yield
+    finally:
+        logger.info("Strapi client metrics", extra={'extra_data': strapi_metrics.report()})
+        await close_http_clients()
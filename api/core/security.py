@@ -1,11 +1,25 @@
-from fastapi import HTTPException, Security, status
-from fastapi.security import APIKeyHeader
-from typing import Optional
+import asyncio
+import hashlib
+import hmac
+import time
+from fastapi import HTTPException, Security, status, Request
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
+from typing import Dict, Optional
 from functools import lru_cache
 
-from utils.secret import get_auth
+from utils.secret import get_auth, lambda_friendly_path
+from api.core.auth import get_current_user, verify_admin_access
+from api.core.config import get_settings
+from api.services.replay_store import get_replay_store
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+optional_bearer = HTTPBearer(auto_error=False)
+
+# HMAC service auth: X-Key-Id, X-Timestamp and X-Signature, where the signature is
+# hex(hmac_sha256(secret, "METHOD\npath?query\ntimestamp\nsha256(body)\nkey_id"))
+KEY_ID_HEADER = "X-Key-Id"
+TIMESTAMP_HEADER = "X-Timestamp"
+SIGNATURE_HEADER = "X-Signature"
 
 @lru_cache()
 def get_api_key(run_stage: str) -> str:
@@ -41,4 +55,147 @@ async def verify_api_key(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error verifying API key: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+
+class BodyDigestMiddleware:
+    """
+    ASGI middleware hashing the body of signed requests as it streams past.
+
+    Only requests carrying X-Signature are touched; the sha256 is updated
+    chunk by chunk in the receive channel, so the body is not buffered a
+    second time. verify_service_signature reads the result from
+    request.state.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or SIGNATURE_HEADER.lower().encode() not in dict(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["body_digest"] = hashlib.sha256()
+        state["body_complete"] = False
+
+        async def hashing_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["body_digest"].update(message.get("body", b""))
+                if not message.get("more_body", False):
+                    state["body_complete"] = True
+            return message
+
+        await self.app(scope, hashing_receive, send)
+
+
+@lru_cache()
+def get_service_keys() -> Dict[str, Dict]:
+    """
+    Service API keys by key id, from secrets manager or SERVICE_API_KEYS.
+
+    The secret maps key ids to either the shared secret or a dict with
+    `secret` and optionally `email` (where batch notifications go).
+    """
+    keys = get_auth(get_settings().SERVICE_KEYS_SSMKEY, envvar='SERVICE_API_KEYS',
+                    fconfig=lambda_friendly_path('.env/service_api_keys.json')) or {}
+    return {key_id: value if isinstance(value, dict) else {"secret": value}
+            for key_id, value in keys.items()}
+
+
+def sign_request(secret: str, method: str, path: str, timestamp: str, body: bytes, key_id: str) -> str:
+    """Signature a service caller sends in X-Signature (also used for verification)"""
+    return _signature(secret, method, path, timestamp, hashlib.sha256(body).hexdigest(), key_id)
+
+
+def _signature(secret, method, path, timestamp, body_sha256, key_id):
+    message = "\n".join([method.upper(), path, timestamp, body_sha256, key_id])
+    return hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def _unauthorized(detail):
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+async def verify_service_signature(request: Request) -> Dict:
+    """
+    Verify an HMAC-signed service request without contacting Strapi.
+
+    Checks the key id, that the timestamp is within SERVICE_AUTH_MAX_SKEW
+    seconds, the body digest and the signature, and rejects a signature
+    seen before (replay).
+
+    Returns:
+        Dict: service identity shaped like get_current_user's result
+    """
+    settings = get_settings()
+    key_id = request.headers.get(KEY_ID_HEADER)
+    timestamp = request.headers.get(TIMESTAMP_HEADER)
+    signature = request.headers.get(SIGNATURE_HEADER)
+    if not key_id or not timestamp or not signature:
+        raise _unauthorized("Missing service signature headers")
+
+    try:
+        key = get_service_keys().get(key_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not get service keys: {str(e)}"
+        )
+    if key is None:
+        raise _unauthorized("Unknown service key")
+
+    try:
+        skew = abs(time.time() - float(timestamp))
+    except ValueError:
+        raise _unauthorized("Invalid timestamp")
+    if skew > settings.SERVICE_AUTH_MAX_SKEW:
+        raise _unauthorized("Request timestamp outside the allowed window")
+
+    if not getattr(request.state, "body_complete", False):
+        # nothing read the body yet (or the middleware is not installed)
+        body = await request.body()
+        if not hasattr(request.state, "body_digest"):
+            request.state.body_digest = hashlib.sha256(body)
+    path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+    expected = _signature(key["secret"], request.method, path, timestamp,
+                          request.state.body_digest.hexdigest(), key_id)
+    if not hmac.compare_digest(expected, signature):
+        raise _unauthorized("Invalid signature")
+
+    # kept until the timestamp falls out of the window, in storage every API worker shares
+    try:
+        first_use = await asyncio.to_thread(get_replay_store().first_use, f"{key_id}:{signature}",
+                                            2 * settings.SERVICE_AUTH_MAX_SKEW)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Could not check request replay: {str(e)}"
+        )
+    if not first_use:
+        raise _unauthorized("Replayed request")
+
+    return {
+        "id": f"service:{key_id}",
+        "email": key.get("email"),
+        "username": key_id,
+        "role": "Service"
+    }
+
+
+async def verify_admin_or_service(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_bearer)
+) -> Dict:
+    """
+    Accept either an HMAC-signed service request or an admin bearer token.
+
+    Signed requests never reach Strapi; everything else goes through
+    get_current_user / verify_admin_access as before.
+    """
+    if request.headers.get(SIGNATURE_HEADER):
+        return await verify_service_signature(request)
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return await verify_admin_access(await get_current_user(request, credentials))
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from api.core.auth import get_jwt_secret
+from api.core.config import get_settings, get_strapi_params
+from utils.secret import get_auth, lambda_friendly_path
+
+# same lookup utils.gdrive.gsheet makes for the service account
+GOOGLE_CREDENTIALS = dict(ssmkey='gspread/config', envvar='GSPREAD_CONFIG',
+                          fconfig='~/.env/gclass_credentials.json')
+
+
+def strapi_token(stage):
+    """Resolve a stage's Strapi token exactly as the Strapi clients do, so get_auth caches it"""
+    root, ssmkey = get_strapi_params(stage)
+    return get_auth(ssmkey, envvar='STRAPI_TOKEN', fconfig=lambda_friendly_path(f'.env/{root}.json'))
+
+
+def google_credentials():
+    return get_auth(**GOOGLE_CREDENTIALS)
+
+
+def _credential_jobs(stages):
+    """
+    One job per distinct Strapi deployment (plus its JWT secret with
+    AUTH_MODE=jwt), then the Google service account
+    """
+    jwt_mode = get_settings().AUTH_MODE == "jwt"
+    jobs = {}
+    for stage in stages:
+        params = get_strapi_params(stage)
+        jobs.setdefault(params, (f'strapi:{stage}', lambda stage=stage: strapi_token(stage)))
+        if jwt_mode:
+            jobs.setdefault(('jwt',) + params, (f'jwt:{stage}', lambda stage=stage: get_jwt_secret(stage)))
+    return list(jobs.values()) + [('google', google_credentials)]
+
+
+async def prefetch_credentials(stages=None):
+    """
+    Resolve every configured stage's Strapi token (and JWT secret) and the
+    Google credentials in worker threads and leave them in get_auth's cache.
+
+    The first lookup runs alone so the shared tenx/env/vars secret is fetched
+    once; the rest then run concurrently. Failures are reported, not raised:
+    those credentials are simply resolved on first use as before.
+
+    Returns:
+        dict: name -> True, or the error message when it failed
+    """
+    settings = get_settings()
+    jobs = _credential_jobs(stages or settings.PREFETCH_STAGES)
+    started = time.perf_counter()
+
+    async def run(name, fn):
+        try:
+            await asyncio.to_thread(fn)
+            return name, True
+        except Exception as e:
+            return name, str(e) or type(e).__name__
+
+    results = [await run(*jobs[0])]
+    results += await asyncio.gather(*(run(name, fn) for name, fn in jobs[1:]))
+    results = dict(results)
+
+    failed = {name: error for name, error in results.items() if error is not True}
+    print(f"Prefetched {len(results) - len(failed)}/{len(results)} credentials "
+          f"in {time.perf_counter() - started:.2f}s")
+    for name, error in failed.items():
+        print(f"  prefetch {name} failed: {error}")
+    return results
+
+
+async def warm_up():
+    """Startup hook: prefetch credentials within PREFETCH_TIMEOUT seconds"""
+    settings = get_settings()
+    if not settings.STARTUP_PREFETCH:
+        return
+    try:
+        await asyncio.wait_for(prefetch_credentials(), settings.PREFETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Credential prefetch did not finish within {settings.PREFETCH_TIMEOUT}s, continuing startup")
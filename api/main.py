@@ -2,16 +2,21 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from pydantic import ValidationError
-from api.routes import trainee_routes, batch_routes, webhook_routes
+from api.routes import trainee_routes, batch_routes, webhook_routes, metrics_routes
 from api.core.error_handlers import validation_exception_handler, pydantic_validation_exception_handler
+from api.core.http_clients import lifespan
+from api.core.security import BodyDigestMiddleware
 from typing import List
 
-app = FastAPI(title="10 Academy User API")
+app = FastAPI(title="10 Academy User API", lifespan=lifespan)
 
 # Add exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(ValidationError, pydantic_validation_exception_handler)
 
+# Hash the body of HMAC-signed service requests while it streams in
+app.add_middleware(BodyDigestMiddleware)
+
 # CORS Settings
 # Additional allowed origins (for localhost development)
 ADDITIONAL_ALLOWED_ORIGINS: List[str] = [
@@ -35,6 +40,7 @@ app.add_middleware(
 app.include_router(trainee_routes.router)
 app.include_router(batch_routes.router)
 app.include_router(webhook_routes.router)
+app.include_router(metrics_routes.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -192,6 +192,7 @@ class BatchConfig(BaseModel):
     delimiter: str = ","
     encoding: str = "utf-8"
     chunk_size: int = 20
+    concurrency: Optional[int] = None  # rows created at once, defaults to chunk_size
     login_url: str  # Login URL will be set from request origin
     admin_email: Optional[str] = None  # Email address for admin notifications
     callback_url: Optional[str] = None  # URL for webhook callbacks
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, status, BackgroundTasks, Depends, Request
 from typing import Optional, Dict
+import asyncio
 import json
 import traceback
 import re
+import uuid
 
-from api.core.auth import verify_admin_access
+from api.core.auth import run_stage_hint
+from api.core.security import verify_admin_or_service
+from api.core.http_clients import webhook_client
 from api.models.trainee import BatchConfig, BatchTraineeCreate, BatchProcessingResponse
 from api.services.batch_service import BatchService
+from api.services.job_store import get_job_store
+from api.services.job_queue import get_job_queue
+from api.core.config import get_settings
 
 router = APIRouter(prefix="/trainee", tags=["trainee"])
 
@@ -15,16 +22,18 @@ async def process_batch(
     request: Request,
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    run_stage: str = Form("dev"),
+    run_stage: Optional[str] = Form(None),
     batch: Optional[str] = Form(""),
     role: str = Form("trainee"),
     group_id: Optional[str] = Form(None),
     delimiter: str = Form(","),
     encoding: str = Form("utf-8"),
     chunk_size: int = Form(20),
+    concurrency: Optional[int] = Form(None),
     is_mock: bool = Form(False),
     login_url: Optional[str] = Form(None),
-    current_user: Dict = Depends(verify_admin_access)
+    current_user: Dict = Depends(verify_admin_or_service),
+    http_client = Depends(webhook_client)
 ):
     """
     Process a batch of trainees from a CSV file
@@ -54,6 +63,9 @@ async def process_batch(
                 error_data=current_user["error"]["error_data"]
             )
 
+        # same precedence as the auth dependency: header, query, form field
+        run_stage = run_stage_hint(request) or run_stage or "dev"
+
         print("\n=== Batch Processing Request ===")
         print(f"User: {current_user['email']}")
         print(f"Batch: {batch}")
@@ -109,6 +121,7 @@ async def process_batch(
                 delimiter=delimiter,
                 encoding=encoding,
                 chunk_size=chunk_size,
+                concurrency=concurrency,
                 login_url=actual_login_url,
                 admin_email=admin_email
             )
@@ -135,16 +148,22 @@ async def process_batch(
                 error_data={"batch_create_error": str(batch_create_error)}
             )
         
-        # Create service instance and add background task
-        batch_service = BatchService(batch_create)
-        background_tasks.add_task(process_batch_background, batch_service)
+        # Record the job, then hand it to a worker process or run it in the background here
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(get_job_store().create_job, job_id, batch=batch,
+                                run_stage=run_stage, submitted_by=admin_email)
+        if get_settings().JOB_EXECUTOR == "queue":
+            await asyncio.to_thread(get_job_queue().enqueue, job_id, batch_create)
+        else:
+            batch_service = BatchService(batch_create, http_client=http_client, job_id=job_id)
+            background_tasks.add_task(process_batch_background, batch_service)
         
-        print("=== Starting Background Processing ===")
+        print(f"=== Starting Background Processing (job {job_id}) ===")
         
         return BatchProcessingResponse.success_response(
             message="Batch processing started",
-            data={"status": "processing", "batch": batch},
-            batch_info={"batch": batch, "admin_email": admin_email}
+            data={"status": "processing", "batch": batch, "job_id": job_id},
+            batch_info={"batch": batch, "admin_email": admin_email, "job_id": job_id}
         )
         
     except HTTPException as http_error:
@@ -160,6 +179,47 @@ async def process_batch(
             error_data={"error": str(e)}
         )
 
+@router.get("/batch/{job_id}", response_model=BatchProcessingResponse)
+async def get_batch_job(
+    job_id: str,
+    include_rows: bool = False,
+    limit: int = 1000,
+    offset: int = 0,
+    current_user: Dict = Depends(verify_admin_or_service)
+):
+    """
+    Progress of a batch job started by POST /trainee/batch
+
+    Returns the job's status, row counts, progress (0-1), throughput
+    (rows_per_second) and eta_seconds, read from the job store only.
+    With include_rows=true, per-row outcomes are added (paged by limit/offset).
+    """
+    if isinstance(current_user, dict) and "success" in current_user and not current_user["success"]:
+        return BatchProcessingResponse.error_response(
+            error_type=current_user["error"]["error_type"],
+            error_message=current_user["error"]["error_message"],
+            error_location=current_user["error"]["error_location"],
+            error_data=current_user["error"]["error_data"]
+        )
+
+    store = get_job_store()
+    job = await asyncio.to_thread(store.progress, job_id)
+    if job is None:
+        return BatchProcessingResponse.error_response(
+            error_type="NOT_FOUND",
+            error_message=f"Batch job {job_id} not found",
+            error_location="job_lookup",
+            error_data={"job_id": job_id}
+        )
+    if include_rows:
+        job["rows"] = await asyncio.to_thread(store.get_rows, job_id, limit=limit, offset=offset)
+
+    return BatchProcessingResponse.success_response(
+        message=f"Batch job {job['status']}",
+        data={**job, "total_processed": job["processed"]},
+        batch_info={"batch": job["batch"], "job_id": job_id}
+    )
+
 async def process_batch_background(service: BatchService):
     try:
         results = await service.process_batch_trainees()
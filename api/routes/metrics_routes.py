@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from typing import Dict
+
+from api.core.security import verify_admin_or_service
+from api.models.trainee import TraineeResponse
+from review_scripts import strapi_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/strapi")
+async def get_strapi_metrics(current_user: Dict = Depends(verify_admin_or_service)):
+    """
+    Strapi client counters (request / response bytes and bytes saved by
+    compression) and the lookup cache's hits, misses and size per namespace.
+
+    Numbers are per process: with several uvicorn workers each answers
+    with its own.
+    """
+    if isinstance(current_user, dict) and "success" in current_user and not current_user["success"]:
+        return current_user
+    return TraineeResponse.success_response(message="Strapi client metrics", data=strapi_metrics.report())
@@ -1,7 +1,9 @@
 from fastapi import HTTPException
 import pandas as pd
 from datetime import datetime
+import asyncio
 import logging
+import time
 import traceback
 from typing import Dict, List, Optional
 import io
@@ -9,32 +11,44 @@ import csv
 import uuid
 
 # Import all your existing classes and models
-from review_scripts.strapi_graphql import StrapiGraphql
-from review_scripts.strapi_methods import StrapiMethods
+from review_scripts.strapi_clients import get_strapi_graphql, get_strapi_methods
+from review_scripts.circuit_breaker import get_circuit_breaker
 from review_scripts.communication_manager import CommunicationManager
 from api.models.trainee import BatchTraineeCreate, TraineeCreate, ConfigInfo, TraineeInfo, BatchConfig
 from api.services.trainee_service import TraineeService
 from api.services.data_processor import DataProcessor
 from api.services.webhook_service import WebhookService
 from api.services.email_service import EmailService
+from api.services.job_store import get_job_store
 from api.core.logging_config import setup_logging
+from api.core.config import get_settings
 from api.utils.password_generator import generate_secure_password
 
 logger = logging.getLogger(__name__)
 
 class BatchService:
-    def __init__(self, batch_create: BatchTraineeCreate):
+    def __init__(self, batch_create: BatchTraineeCreate, http_client=None, job_id: Optional[str] = None,
+                 attempt: Optional[int] = None):
         self.batch_create = batch_create
+        # progress is recorded in the job store when the batch runs as a tracked job;
+        # attempt (from the job queue) keeps a superseded run from overwriting a newer one
+        self.job_id = job_id
+        self.attempt = attempt
+        self.job_store = get_job_store() if job_id else None
+        # finished rows not written to the job store yet, as (row_num, entry, duration)
+        self._pending_rows = []
+        self._rows_flushed_at = time.monotonic()
         self.config = batch_create.config
         self.file_content = batch_create.file_content
-        self.sg = StrapiGraphql(run_stage=self.config.run_stage)
-        self.sm = StrapiMethods(run_stage=self.config.run_stage)
+        self.sg = get_strapi_graphql(self.config.run_stage)
+        self.sm = get_strapi_methods(self.config.run_stage)
         self.cm = CommunicationManager()
+        self.breaker = get_circuit_breaker(self.config.run_stage)
         self.data_processor = DataProcessor(self.config)
         self.logger = setup_logging()
         
         # Initialize webhook service if callback_url is provided
-        self.webhook_service = WebhookService(self.config) if self.config.callback_url else None
+        self.webhook_service = WebhookService(self.config, client=http_client) if self.config.callback_url else None
         
         # Initialize email service
         self.sender_email = "train@10academy.org"
@@ -76,6 +90,9 @@ class BatchService:
         try:
             # Process the batch
             results = await self._process_batch_records()
+            await self._flush_rows()
+            await self._track('finish', results.get('status', 'completed'), results.get('error_message'),
+                              attempt=self.attempt)
             
             # Send notifications
             await self._send_notifications(results)
@@ -94,6 +111,8 @@ class BatchService:
             
         except Exception as e:
             error_response = self._create_error_response(e)
+            await self._flush_rows()
+            await self._track('finish', 'failed', str(e), attempt=self.attempt)
             self.logger.error("Batch processing failed", extra={
                 'error': str(e),
                 'traceback': traceback.format_exc()
@@ -118,6 +137,7 @@ class BatchService:
                 return df
                 
             if len(df) == 0:
+                await self._track('start', 0, attempt=self.attempt)
                 return {
                     'status': 'completed',
                     'total_processed': 0,
@@ -131,38 +151,52 @@ class BatchService:
                 return df
 
             total = len(df)
-            successful = []
-            failed = []
-            
-            # Process each record
-            for index, row in df.iterrows():
-                try:
+            window = self._concurrency_window(total)
+            semaphore = asyncio.Semaphore(window)
+            # set once Strapi is unavailable: rows still waiting are skipped
+            abort = asyncio.Event()
+            started = time.perf_counter()
+            await self._track('start', total, attempt=self.attempt)
+            # rows a previous attempt of this job already created are not sent again
+            done = await self._succeeded_rows()
+
+            async def process(index, row):
+                async with semaphore:
                     row_num = index + 1
-                    result = await self._process_trainee_record(row, row_num)
-                    
-                    if result.get('status') == 'Success':
-                        successful.append(result)
-                    else:
-                        failed.append({
-                            'name': row.get('name', 'Unknown'),
-                            'email': row.get('email', 'Unknown'),
-                            'status': 'Failed',
-                            'error_type': result.get('error_type', 'PROCESSING_ERROR'),
-                            'error_message': result.get('error_message', 'Email or Username already exists')
+                    if row_num in done:
+                        # the password of a mock user created earlier is not stored
+                        return {**done[row_num], 'password': None, 'status': 'Success', 'resumed': True}
+                    if abort.is_set():
+                        entry = self._skipped_row(row)
+                        await self._record_row(row_num, entry)
+                        return entry
+                    row_started = time.perf_counter()
+                    entry = await self._process_row(row, row_num)
+                    await self._record_row(row_num, entry, time.perf_counter() - row_started)
+                    # Strapi is down: fail the rest of the batch instead of
+                    # waiting on every remaining row
+                    if (entry.get('error_type') == 'STRAPI_UNAVAILABLE' and self.breaker.is_open
+                            and not abort.is_set()):
+                        abort.set()
+                        self.logger.error("Strapi unavailable, aborting batch", extra={
+                            'row': row_num,
+                            'batch': self.config.batch
                         })
-                except Exception as e:
-                    self.logger.error("Error processing trainee record", extra={
-                        'row': index + 1,
-                        'error': str(e),
-                        'row_data': row.to_dict()
-                    })
-                    failed.append({
-                        'name': row.get('name', 'Unknown'),
-                        'email': row.get('email', 'Unknown'),
-                        'status': 'Failed',
-                        'error_type': 'PROCESSING_ERROR',
-                        'error_message': str(e)
-                    })
+                    return entry
+
+            # gather keeps the results in row order whatever order rows finish in
+            entries = await asyncio.gather(*(process(index, row) for index, row in df.iterrows()))
+            successful = [entry for entry in entries if entry.get('status') == 'Success']
+            failed = [entry for entry in entries if entry.get('status') != 'Success']
+
+            elapsed = time.perf_counter() - started
+            self.logger.info("Batch rows processed", extra={
+                'rows': total,
+                'concurrency': window,
+                'duration_seconds': round(elapsed, 2),
+                'rows_per_second': round(total / elapsed, 2) if elapsed else None,
+                'batch': self.config.batch
+            })
 
             return self._compile_results(total, successful, failed)
 
@@ -173,6 +207,100 @@ class BatchService:
             })
             return self._create_error_response(e)
 
+    async def _track(self, method: str, *args, **kwargs) -> None:
+        """
+        Report progress to the job store in a worker thread, off the event
+        loop; a store failure never fails the batch
+        """
+        if self.job_store is None:
+            return
+        try:
+            await asyncio.to_thread(getattr(self.job_store, method), self.job_id, *args, **kwargs)
+        except Exception as e:
+            self.logger.error("Failed to update job store", extra={
+                'job_id': self.job_id,
+                'update': method,
+                'error': str(e)
+            })
+
+    async def _succeeded_rows(self) -> Dict[int, Dict]:
+        """Rows already created by an earlier attempt of this job, by row number"""
+        if self.job_store is None:
+            return {}
+        try:
+            return await asyncio.to_thread(self.job_store.succeeded_rows, self.job_id)
+        except Exception as e:
+            self.logger.error("Failed to read job store", extra={
+                'job_id': self.job_id,
+                'error': str(e)
+            })
+            return {}
+
+    async def _record_row(self, row_num: int, entry: Dict, duration: Optional[float] = None) -> None:
+        """
+        Record a finished row. A created user is written at once (with any
+        buffered rows), so a resumed job never creates it again; failed rows
+        are buffered for JOB_PROGRESS_BATCH rows or JOB_PROGRESS_INTERVAL seconds.
+        """
+        if self.job_store is None:
+            return
+        self._pending_rows.append((row_num, entry, duration))
+        settings = get_settings()
+        if (entry.get('status') == 'Success'
+                or len(self._pending_rows) >= settings.JOB_PROGRESS_BATCH
+                or time.monotonic() - self._rows_flushed_at >= settings.JOB_PROGRESS_INTERVAL):
+            await self._flush_rows()
+
+    async def _flush_rows(self) -> None:
+        """Write the buffered rows in one store call"""
+        # taken before awaiting, so rows finishing meanwhile go to the next flush
+        rows, self._pending_rows = self._pending_rows, []
+        self._rows_flushed_at = time.monotonic()
+        if rows:
+            await self._track('record_rows', rows, attempt=self.attempt)
+
+    def _concurrency_window(self, total: int) -> int:
+        """Rows created at once: config.concurrency, else chunk_size, capped by BATCH_MAX_CONCURRENCY"""
+        window = self.config.concurrency or self.config.chunk_size or 1
+        return max(1, min(window, get_settings().BATCH_MAX_CONCURRENCY, total))
+
+    async def _process_row(self, row: pd.Series, row_num: int) -> Dict:
+        """Create one trainee and turn the outcome into a successful / failed entry"""
+        try:
+            result = await self._process_trainee_record(row, row_num)
+            if result.get('status') == 'Success':
+                return result
+            return {
+                'name': row.get('name', 'Unknown'),
+                'email': row.get('email', 'Unknown'),
+                'status': 'Failed',
+                'error_type': result.get('error_type', 'PROCESSING_ERROR'),
+                'error_message': result.get('error_message', 'Email or Username already exists')
+            }
+        except Exception as e:
+            self.logger.error("Error processing trainee record", extra={
+                'row': row_num,
+                'error': str(e),
+                'row_data': row.to_dict()
+            })
+            return {
+                'name': row.get('name', 'Unknown'),
+                'email': row.get('email', 'Unknown'),
+                'status': 'Failed',
+                'error_type': 'PROCESSING_ERROR',
+                'error_message': str(e)
+            }
+
+    def _skipped_row(self, row: pd.Series) -> Dict:
+        """Failed entry for a row that was not attempted because Strapi is unavailable"""
+        return {
+            'name': row.get('name', 'Unknown'),
+            'email': row.get('email', 'Unknown'),
+            'status': 'Failed',
+            'error_type': 'STRAPI_UNAVAILABLE',
+            'error_message': 'Skipped: Strapi is unavailable'
+        }
+
     async def _process_trainee_record(self, row: pd.Series, row_num: int) -> Dict:
         """Process a single trainee record"""
         try:
@@ -211,7 +339,7 @@ class BatchService:
 
             # Create trainee via service
             trainee_service = TraineeService(trainee_create)
-            result = trainee_service.create_trainee_services()  # Remove await since it's synchronous
+            result = await trainee_service.create_trainee_services()
             
             if result.get('success'):
                 # If real user, send welcome email
@@ -461,6 +589,9 @@ class BatchService:
                                 'username': trainee.get('email'),
                                 'password': trainee.get('password')
                             }
+                        if trainee.get('resumed'):
+                            # created by an earlier attempt of the job, password not available
+                            trainee_info['resumed'] = True
                         successful_details.append(trainee_info)
                     
                     # Create the processing status detail with the correct structure
@@ -631,7 +762,7 @@ class BatchService:
                     trainee.get('email', ''),
                     trainee.get('password', ''),
                     "Success",
-                    ""
+                    "Created by an earlier attempt, password not available" if trainee.get('resumed') else ""
                 ])
             else:
                 writer.writerow([
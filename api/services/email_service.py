@@ -1,10 +1,11 @@
-import boto3
 from botocore.exceptions import ClientError
 import logging
 from typing import List, Dict, Optional
 import asyncio
 from functools import wraps
 
+from utils.aws_clients import get_client
+
 def async_wrap(func):
     @wraps(func)
     async def run(*args, **kwargs):
@@ -20,7 +21,7 @@ class EmailService:
             region_name: AWS region name
             source_email: Verified email address to send from
         """
-        self.client = boto3.client('ses', region_name=region_name)
+        self.client = get_client('ses', region_name=region_name)
         self.source_email = source_email
         self.logger = logging.getLogger(__name__)
 
@@ -0,0 +1,279 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from api.core.config import get_settings
+from api.models.trainee import BatchTraineeCreate
+
+try:
+    import redis
+except ImportError:  # only needed for JOB_QUEUE_BACKEND=redis
+    redis = None
+
+
+def encode_batch(batch_create: BatchTraineeCreate) -> Tuple[str, bytes]:
+    """(config json, file bytes) a queued job is stored as"""
+    return json.dumps(batch_create.config.model_dump()), batch_create.file_content
+
+
+def decode_batch(config_json: str, file_content: bytes) -> BatchTraineeCreate:
+    return BatchTraineeCreate(config=json.loads(config_json), file_content=file_content)
+
+
+class JobQueue(ABC):
+    """
+    Hand-off of batch jobs from the API to `python -m api.worker`.
+
+    enqueue() stores the uploaded batch under its job id; a worker claim()s
+    it, heartbeat()s while it runs and complete()s it. Jobs whose worker
+    stopped heartbeating for JOB_LEASE_TIMEOUT seconds go back to the queue
+    via requeue_stale(), up to JOB_MAX_ATTEMPTS claims. heartbeat() and
+    complete() only act while `worker_id` still holds the job's lease.
+
+    Methods block; async callers run them with asyncio.to_thread.
+    """
+    @abstractmethod
+    def enqueue(self, job_id: str, batch_create: BatchTraineeCreate) -> None:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> Optional[Tuple[str, BatchTraineeCreate, int]]:
+        """Next job as (job_id, batch_create, attempt), or None when the queue is empty"""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False when the job is no longer this worker's"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """Remove a finished job; False when the job is no longer this worker's"""
+
+    @abstractmethod
+    def requeue_stale(self, lease_timeout: float, max_attempts: int) -> list:
+        """Requeue jobs of dead workers; returns the job ids given up on (max attempts reached)"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    JobQueue in a local SQLite file shared by the API and worker processes
+    of one host (by default the job store's file).
+    """
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        # autocommit mode, transactions are opened explicitly where needed
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    job_id TEXT PRIMARY KEY,
+                    config TEXT NOT NULL,
+                    file_content BLOB NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at REAL NOT NULL,
+                    heartbeat_at REAL
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS job_queue_status ON job_queue (status, enqueued_at)")
+
+    def enqueue(self, job_id, batch_create):
+        config, file_content = encode_batch(batch_create)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_queue (job_id, config, file_content, status, enqueued_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, config, file_content, time.time()))
+
+    def claim(self, worker_id):
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock, so two workers never claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, config, file_content, attempts FROM job_queue "
+                    "WHERE status = 'queued' ORDER BY enqueued_at LIMIT 1").fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE job_queue SET status = 'claimed', worker = ?, heartbeat_at = ?, "
+                        "attempts = attempts + 1 WHERE job_id = ?",
+                        (worker_id, time.time(), row[0]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, config, file_content, attempts = row
+        return job_id, decode_batch(config, file_content), attempts + 1
+
+    def heartbeat(self, job_id, worker_id):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE job_queue SET heartbeat_at = ? WHERE job_id = ? AND worker = ? AND status = 'claimed'",
+                (time.time(), job_id, worker_id))
+        return cursor.rowcount > 0
+
+    def complete(self, job_id, worker_id):
+        # requeue_stale clears worker, so a worker whose job was requeued cannot remove it
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM job_queue WHERE job_id = ? AND worker = ?",
+                                        (job_id, worker_id))
+        return cursor.rowcount > 0
+
+    def requeue_stale(self, lease_timeout, max_attempts):
+        cutoff = time.time() - lease_timeout
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                stale = self._conn.execute(
+                    "SELECT job_id, attempts FROM job_queue WHERE status = 'claimed' AND heartbeat_at < ?",
+                    (cutoff,)).fetchall()
+                abandoned = [job_id for job_id, attempts in stale if attempts >= max_attempts]
+                for job_id, attempts in stale:
+                    if attempts >= max_attempts:
+                        self._conn.execute("DELETE FROM job_queue WHERE job_id = ?", (job_id,))
+                    else:
+                        self._conn.execute(
+                            "UPDATE job_queue SET status = 'queued', worker = NULL WHERE job_id = ?",
+                            (job_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return abandoned
+
+
+class RedisJobQueue(JobQueue):
+    """
+    JobQueue on a Redis-compatible server (Redis, Valkey, KeyDB ...), for
+    workers on other hosts than the API. Needs the `redis` package.
+
+    Job ids move from the `queued` list to the `claimed` list (LMOVE); the
+    job itself is a hash, and a lease key holding the worker id with a TTL
+    marks a live worker. Every step that reads and changes a job runs as one
+    Lua script, so a claim and its lease, or a lease check and its effect,
+    are never split. The claim script derives job and lease keys from the
+    id it pops, so the keys must live on one server (no Redis Cluster).
+    """
+    # KEYS: queued, claimed; ARGV: worker_id, lease seconds, key prefix
+    CLAIM_SCRIPT = """
+        local job_id = redis.call('LMOVE', KEYS[1], KEYS[2], 'RIGHT', 'LEFT')
+        if not job_id then return false end
+        redis.call('SET', ARGV[3] .. ':lease:' .. job_id, ARGV[1], 'EX', ARGV[2])
+        local attempts = redis.call('HINCRBY', ARGV[3] .. ':job:' .. job_id, 'attempts', 1)
+        return {job_id, attempts}
+    """
+    # KEYS: lease; ARGV: worker_id, lease seconds
+    HEARTBEAT_SCRIPT = """
+        if redis.call('GET', KEYS[1]) ~= ARGV[1] then return 0 end
+        return redis.call('EXPIRE', KEYS[1], ARGV[2])
+    """
+    # KEYS: lease, claimed, job; ARGV: worker_id, job_id
+    # an expired lease still allows completing while the job was not requeued yet
+    COMPLETE_SCRIPT = """
+        local owner = redis.call('GET', KEYS[1])
+        if owner and owner ~= ARGV[1] then return 0 end
+        if redis.call('LREM', KEYS[2], 0, ARGV[2]) == 0 and not owner then return 0 end
+        redis.call('DEL', KEYS[3], KEYS[1])
+        return 1
+    """
+    # KEYS: lease, claimed, queued, job; ARGV: job_id, max_attempts
+    # returns 0 when the job is alive (or gone), 1 requeued, 2 given up
+    REQUEUE_SCRIPT = """
+        if redis.call('EXISTS', KEYS[1]) == 1 then return 0 end
+        if redis.call('LREM', KEYS[2], 1, ARGV[1]) == 0 then return 0 end
+        local attempts = tonumber(redis.call('HGET', KEYS[4], 'attempts') or '0')
+        if attempts >= tonumber(ARGV[2]) then
+            redis.call('DEL', KEYS[4])
+            return 2
+        end
+        redis.call('RPUSH', KEYS[3], ARGV[1])
+        return 1
+    """
+
+    def __init__(self, url: str, prefix: str = "batchjobs"):
+        if redis is None:
+            raise ImportError("JOB_QUEUE_BACKEND=redis needs the redis package (pip install redis)")
+        self.redis = redis.Redis.from_url(url)
+        self.queued = f"{prefix}:queued"
+        self.claimed = f"{prefix}:claimed"
+        self.prefix = prefix
+        self._claim = self.redis.register_script(self.CLAIM_SCRIPT)
+        self._heartbeat = self.redis.register_script(self.HEARTBEAT_SCRIPT)
+        self._complete = self.redis.register_script(self.COMPLETE_SCRIPT)
+        self._requeue = self.redis.register_script(self.REQUEUE_SCRIPT)
+
+    def _job(self, job_id):
+        return f"{self.prefix}:job:{job_id}"
+
+    def _lease(self, job_id):
+        return f"{self.prefix}:lease:{job_id}"
+
+    def enqueue(self, job_id, batch_create):
+        config, file_content = encode_batch(batch_create)
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job(job_id), mapping={"config": config, "file_content": file_content, "attempts": 0})
+        pipe.lpush(self.queued, job_id)
+        pipe.execute()
+
+    def claim(self, worker_id):
+        lease = int(get_settings().JOB_LEASE_TIMEOUT)
+        claimed = self._claim(keys=[self.queued, self.claimed], args=[worker_id, lease, self.prefix])
+        if not claimed:
+            return None
+        job_id, attempts = claimed[0].decode(), int(claimed[1])
+        config, file_content = self.redis.hmget(self._job(job_id), "config", "file_content")
+        return job_id, decode_batch(config.decode(), file_content), attempts
+
+    def heartbeat(self, job_id, worker_id):
+        lease = int(get_settings().JOB_LEASE_TIMEOUT)
+        return bool(self._heartbeat(keys=[self._lease(job_id)], args=[worker_id, lease]))
+
+    def complete(self, job_id, worker_id):
+        return bool(self._complete(keys=[self._lease(job_id), self.claimed, self._job(job_id)],
+                                   args=[worker_id, job_id]))
+
+    def requeue_stale(self, lease_timeout, max_attempts):
+        # the lease TTL already encodes lease_timeout: a claimed job without a lease is stale
+        abandoned = []
+        for raw in self.redis.lrange(self.claimed, 0, -1):
+            job_id = raw.decode()
+            outcome = self._requeue(keys=[self._lease(job_id), self.claimed, self.queued, self._job(job_id)],
+                                    args=[job_id, max_attempts])
+            if outcome == 2:
+                abandoned.append(job_id)
+        return abandoned
+
+
+# backend name (JOB_QUEUE_BACKEND) -> factory taking the settings
+JOB_QUEUE_BACKENDS = {
+    'sqlite': lambda settings: SQLiteJobQueue(settings.JOB_QUEUE_PATH or settings.JOB_STORE_PATH),
+    'redis': lambda settings: RedisJobQueue(settings.JOB_QUEUE_URL),
+}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def register_job_queue(name: str, factory) -> None:
+    """Make another backend selectable through JOB_QUEUE_BACKEND"""
+    JOB_QUEUE_BACKENDS[name] = factory
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide JobQueue for the configured backend"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                settings = get_settings()
+                _queue = JOB_QUEUE_BACKENDS[settings.JOB_QUEUE_BACKEND](settings)
+    return _queue
@@ -0,0 +1,250 @@
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from api.core.config import get_settings
+
+# jobs still doing work; anything else is final
+ACTIVE_STATUSES = ('queued', 'running')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    batch TEXT,
+    run_stage TEXT,
+    submitted_by TEXT,
+    status TEXT NOT NULL,
+    total_rows INTEGER,
+    processed INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL,
+    attempt INTEGER
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    row_num INTEGER NOT NULL,
+    name TEXT,
+    email TEXT,
+    status TEXT NOT NULL,
+    error_type TEXT,
+    error_message TEXT,
+    duration REAL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (job_id, row_num)
+);
+"""
+
+# columns added after the first release: (table, column, type), added to older files on open
+ADDED_COLUMNS = [
+    ('jobs', 'attempt', 'INTEGER'),
+]
+
+
+class JobStore(ABC):
+    """
+    Where batch jobs record their progress.
+
+    BatchService reports the job lifecycle (create -> start -> record_rows
+    for each batch of finished rows -> finish) and GET /trainee/batch/{job_id}
+    reads it back with get_job. Backends implement the storage methods;
+    progress() derives throughput and ETA from what they return.
+
+    Queued jobs pass the queue's attempt number to start, record_rows and
+    finish. Once an attempt has started, writes of older attempts (a worker
+    that lost its lease) are dropped. attempt=None writes unconditionally.
+
+    Methods block; async callers run them with asyncio.to_thread.
+    """
+    @abstractmethod
+    def create_job(self, job_id: str, batch: str = None, run_stage: str = None,
+                   submitted_by: str = None) -> None:
+        ...
+
+    @abstractmethod
+    def start(self, job_id: str, total_rows: int, attempt: int = None) -> None:
+        ...
+
+    @abstractmethod
+    def record_rows(self, job_id: str, rows: Sequence[Tuple[int, Dict, Optional[float]]],
+                    attempt: int = None) -> None:
+        """
+        Store finished rows given as (row_num, entry, duration) and count them.
+        A row already stored as Success is never replaced.
+        """
+
+    @abstractmethod
+    def finish(self, job_id: str, status: str, error: str = None, attempt: int = None) -> None:
+        ...
+
+    @abstractmethod
+    def succeeded_rows(self, job_id: str) -> Dict[int, Dict]:
+        """row_num -> {name, email} of the rows an earlier attempt already created"""
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def get_rows(self, job_id: str, limit: int = 1000, offset: int = 0) -> List[Dict]:
+        ...
+
+    def progress(self, job_id: str) -> Optional[Dict]:
+        """
+        Job record plus progress (0-1), throughput (rows/s) and ETA (seconds),
+        or None for an unknown job id
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return None
+
+        total, processed = job['total_rows'], job['processed']
+        end = job['finished_at'] or time.time()
+        elapsed = end - job['started_at'] if job['started_at'] else 0
+        throughput = processed / elapsed if elapsed > 0 and processed else None
+        eta = None
+        if job['status'] in ACTIVE_STATUSES and throughput and total is not None:
+            eta = max(total - processed, 0) / throughput
+        return {
+            **job,
+            'progress': processed / total if total else (1.0 if total == 0 else None),
+            'elapsed_seconds': round(elapsed, 2),
+            'rows_per_second': round(throughput, 2) if throughput else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+        }
+
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore in a local SQLite file.
+
+    WAL mode lets the API workers (and batch workers) sharing the file read
+    progress while a job writes it. One connection per store, serialised
+    with a lock; every write is a single short transaction.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            for table, column, kind in ADDED_COLUMNS:
+                columns = [row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    def _execute(self, sql, params=()):
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def create_job(self, job_id, batch=None, run_stage=None, submitted_by=None):
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (job_id, batch, run_stage, submitted_by, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+            (job_id, batch, run_stage, submitted_by, now, now))
+
+    # true while `attempt` (:attempt, None = any) is the job's current attempt
+    CURRENT_ATTEMPT = "(:attempt IS NULL OR COALESCE(attempt, 0) <= :attempt)"
+
+    def start(self, job_id, total_rows, attempt=None):
+        # a requeued job keeps the rows of the earlier attempt; failed ones are replaced as they rerun
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = 'running', total_rows = :total_rows, error = NULL, "
+            "started_at = COALESCE(started_at, :now), finished_at = NULL, updated_at = :now, "
+            "attempt = COALESCE(:attempt, attempt) "
+            f"WHERE job_id = :job_id AND {self.CURRENT_ATTEMPT}",
+            {'job_id': job_id, 'total_rows': total_rows, 'now': now, 'attempt': attempt})
+
+    def record_rows(self, job_id, rows, attempt=None):
+        if not rows:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            current = self._conn.execute(
+                f"SELECT 1 FROM jobs WHERE job_id = :job_id AND {self.CURRENT_ATTEMPT}",
+                {'job_id': job_id, 'attempt': attempt}).fetchone()
+            if current is None:
+                return
+            self._conn.executemany(
+                "INSERT INTO job_rows (job_id, row_num, name, email, status, error_type, "
+                "error_message, duration, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (job_id, row_num) DO UPDATE SET name = excluded.name, "
+                "email = excluded.email, status = excluded.status, error_type = excluded.error_type, "
+                "error_message = excluded.error_message, duration = excluded.duration, "
+                "finished_at = excluded.finished_at WHERE job_rows.status != 'Success'",
+                [(job_id, row_num, entry.get('name'), entry.get('email'), entry.get('status'),
+                  entry.get('error_type'), entry.get('error_message'), duration, now)
+                 for row_num, entry, duration in rows])
+            # counted from job_rows, so rows replaced on a retry are not counted twice
+            self._conn.execute(
+                "UPDATE jobs SET "
+                "processed = (SELECT COUNT(*) FROM job_rows WHERE job_id = :job_id), "
+                "successful = (SELECT COUNT(*) FROM job_rows WHERE job_id = :job_id AND status = 'Success'), "
+                "failed = (SELECT COUNT(*) FROM job_rows WHERE job_id = :job_id AND status != 'Success'), "
+                "updated_at = :now WHERE job_id = :job_id",
+                {'job_id': job_id, 'now': now})
+
+    def finish(self, job_id, status, error=None, attempt=None):
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = :status, error = :error, finished_at = :now, updated_at = :now "
+            f"WHERE job_id = :job_id AND {self.CURRENT_ATTEMPT}",
+            {'job_id': job_id, 'status': status, 'error': error, 'now': now, 'attempt': attempt})
+
+    def succeeded_rows(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_num, name, email FROM job_rows WHERE job_id = ? AND status = 'Success'",
+                (job_id,)).fetchall()
+        return {row['row_num']: {'name': row['name'], 'email': row['email']} for row in rows}
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_rows(self, job_id, limit=1000, offset=0):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_num, name, email, status, error_type, error_message, duration "
+                "FROM job_rows WHERE job_id = ? ORDER BY row_num LIMIT ? OFFSET ?",
+                (job_id, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+
+# backend name (JOB_STORE_BACKEND) -> factory taking the settings
+JOB_STORE_BACKENDS = {
+    'sqlite': lambda settings: SQLiteJobStore(settings.JOB_STORE_PATH),
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def register_job_store(name: str, factory) -> None:
+    """Make another backend selectable through JOB_STORE_BACKEND"""
+    JOB_STORE_BACKENDS[name] = factory
+
+
+def get_job_store() -> JobStore:
+    """Process-wide JobStore for the configured backend"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                settings = get_settings()
+                _store = JOB_STORE_BACKENDS[settings.JOB_STORE_BACKEND](settings)
+    return _store
@@ -0,0 +1,109 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from api.core.config import get_settings
+from review_scripts.strapi_cache import TTLCache
+
+try:
+    import redis
+except ImportError:  # only needed for SERVICE_REPLAY_BACKEND=redis
+    redis = None
+
+
+class ReplayStore(ABC):
+    """
+    Signed-request ids already accepted, shared by every API worker so a
+    captured request cannot be replayed against another worker (or after a
+    restart) while its timestamp is still inside SERVICE_AUTH_MAX_SKEW.
+
+    Methods block; async callers run them with asyncio.to_thread.
+    """
+    @abstractmethod
+    def first_use(self, key: str, ttl: float) -> bool:
+        """Remember `key` for `ttl` seconds; False when it was already seen"""
+
+
+class MemoryReplayStore(ReplayStore):
+    """Per-process store: only protects a single API worker (WORKERS=1)"""
+    def __init__(self, maxsize: int):
+        self._seen = TTLCache(get_settings().SERVICE_AUTH_MAX_SKEW * 2, maxsize)
+        self._lock = threading.Lock()
+
+    def first_use(self, key, ttl):
+        with self._lock:
+            found, _ = self._seen.get(('signature', key))
+            if found:
+                return False
+            self._seen.set(('signature', key), True, ttl=ttl)
+            return True
+
+
+class SQLiteReplayStore(ReplayStore):
+    """
+    ReplayStore in a SQLite file shared by the API workers of one host (by
+    default the job store's file). The insert-if-absent runs in one write
+    transaction, so two workers never both accept the same key.
+    """
+    # expired keys are deleted on every PURGE_EVERY-th insert
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_signatures (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)")
+
+    def first_use(self, key, ttl):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM seen_signatures WHERE key = ? AND expires_at < ?", (key, now))
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO seen_signatures (key, expires_at) VALUES (?, ?)",
+                (key, now + ttl)).rowcount == 1
+            self._inserts += 1
+            if self._inserts % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM seen_signatures WHERE expires_at < ?", (now,))
+        return inserted
+
+
+class RedisReplayStore(ReplayStore):
+    """ReplayStore on the Redis server of the job queue (SET NX EX)"""
+    def __init__(self, url: str, prefix: str = "signatures"):
+        if redis is None:
+            raise ImportError("SERVICE_REPLAY_BACKEND=redis needs the redis package (pip install redis)")
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def first_use(self, key, ttl):
+        return bool(self.redis.set(f"{self.prefix}:{key}", 1, nx=True, ex=max(1, math.ceil(ttl))))
+
+
+# backend name (SERVICE_REPLAY_BACKEND) -> factory taking the settings
+REPLAY_STORE_BACKENDS = {
+    'sqlite': lambda settings: SQLiteReplayStore(settings.JOB_STORE_PATH),
+    'redis': lambda settings: RedisReplayStore(settings.JOB_QUEUE_URL),
+    'memory': lambda settings: MemoryReplayStore(settings.SERVICE_REPLAY_CACHE_MAXSIZE),
+}
+
+_replay_store = None
+_replay_store_lock = threading.Lock()
+
+
+def get_replay_store() -> ReplayStore:
+    """Process-wide ReplayStore for the configured backend"""
+    global _replay_store
+    if _replay_store is None:
+        with _replay_store_lock:
+            if _replay_store is None:
+                settings = get_settings()
+                _replay_store = REPLAY_STORE_BACKENDS[settings.SERVICE_REPLAY_BACKEND](settings)
+    return _replay_store
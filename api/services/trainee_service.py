@@ -2,11 +2,16 @@ from fastapi import HTTPException
 import uuid
 from typing import Dict, Tuple, Union, Any
 import traceback
-import requests
+import httpx
 
-from review_scripts.strapi_graphql import StrapiGraphql
-from review_scripts.strapi_methods import StrapiMethods
-from review_scripts.communication_manager import CommunicationManager
+from review_scripts.strapi_clients import get_async_strapi_client
+from review_scripts.strapi_errors import (
+    StrapiError,
+    StrapiConflictError,
+    StrapiTransientError,
+    error_for_status,
+    response_details,
+)
 from api.models.trainee import TraineeCreate, TraineeResponse
 from api.services.data_processor import DataProcessor
 
@@ -16,9 +21,7 @@ class TraineeService:
         self.config = data.config
         # add essential data from config to trainee_data
        
-        self.sg = StrapiGraphql(run_stage=self.config.run_stage)
-        self.sm = StrapiMethods(run_stage=self.config.run_stage)
-        self.cm = CommunicationManager()
+        self.client = get_async_strapi_client(self.config.run_stage)
         self.data_processor = DataProcessor(self.config)
     
         
@@ -30,31 +33,44 @@ class TraineeService:
             'trainee_id': None
         }
 
-    def _cleanup_resources(self, error_step: str):
+    def _unavailable_response(self, error: StrapiTransientError, error_location: str, data: Dict) -> Dict:
+        """
+        Error response for a transient Strapi failure. No cleanup is attempted
+        (it would only add calls against a failing backend), the ids created so
+        far are returned instead.
+        """
+        return TraineeResponse.error_response(
+            error_type="STRAPI_UNAVAILABLE",
+            error_message=str(error),
+            error_location=error_location,
+            error_data={**data, "created_resources": dict(self.created_resources)}
+        )
+
+    async def _cleanup_resources(self, error_step: str):
         """Clean up created resources if an error occurs"""
         try:
             if error_step == 'alluser' and self.created_resources['user_id']:
-                self.cm.delete_user(self.sg, self.created_resources['user_id'])
+                await self.client.delete_user(self.created_resources['user_id'])
                 
             elif error_step == 'profile':
                 if self.created_resources['alluser_id']:
-                    self.cm.delete_alluser(self.sg, self.created_resources['alluser_id'])
+                    await self.client.delete_alluser(self.created_resources['alluser_id'])
                 if self.created_resources['user_id']:
-                    self.cm.delete_user(self.sg, self.created_resources['user_id'])
+                    await self.client.delete_user(self.created_resources['user_id'])
                     
             elif error_step == 'trainee':
                 if self.created_resources['trainee_id']:
-                    self.cm.delete_trainee(self.sg, self.created_resources['trainee_id'])
+                    await self.client.delete_trainee(self.created_resources['trainee_id'])
                 if self.created_resources['profile_id']:
-                    self.cm.delete_profile(self.sg, self.created_resources['profile_id'])
+                    await self.client.delete_profile(self.created_resources['profile_id'])
                 if self.created_resources['alluser_id']:
-                    self.cm.delete_alluser(self.sg, self.created_resources['alluser_id'])
+                    await self.client.delete_alluser(self.created_resources['alluser_id'])
                 if self.created_resources['user_id']:
-                    self.cm.delete_user(self.sg, self.created_resources['user_id'])
+                    await self.client.delete_user(self.created_resources['user_id'])
         except Exception as e:
             print(f"Error during cleanup: {str(e)}")
 
-    def create_unconfirmed_user(self, user_data):
+    async def create_unconfirmed_user(self, user_data):
         """
         Create an unconfirmed user using the provided user data and return the result in JSON format.
 
@@ -80,20 +96,9 @@ class TraineeService:
                     error_data={"missing_fields": missing_fields}
                 )
             
-            request_link = self.sm.apiroot + "/api/auth/local/register"
-            
-            print("rest Request link", request_link) 
             print("user_var", user_var)
-            print("token", self.sm.token)
             # Make the request to create user
-            response = requests.post(
-                request_link,
-                json=user_var,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.sm.token}"
-                }
-            )
+            response = await self.client.register_user(user_var)
             print("unconfirmed response...", response)
             # Check if the request was successful
         
@@ -104,14 +109,28 @@ class TraineeService:
                     "status_code": response.status_code,
                     "response_text": response.text
                 }
+                error = error_for_status(response.status_code, response_details(response))
+                if isinstance(error, StrapiConflictError):
+                    error_message = "Duplicate email address"
+                else:
+                    error_message = f"Failed to create user. Status code: {response.status_code}"
                 return TraineeResponse.error_response(
                     error_type="USER_CREATION_ERROR",
-                    error_message=f"Failed to create user. Status code: {response.status_code}",
+                    error_message=error_message,
                     error_location="user_creation",
                     error_data=error_data
                 )
 
-        except requests.exceptions.RequestException as e:
+        except StrapiTransientError as e:
+            return self._unavailable_response(e, "user_creation", {"email": user_data['email']})
+        except StrapiError as e:
+            return TraineeResponse.error_response(
+                error_type="USER_CREATION_ERROR",
+                error_message=str(e),
+                error_location="user_creation",
+                error_data={"exception": str(e)}
+            )
+        except httpx.HTTPError as e:
             return TraineeResponse.error_response(
                 error_type="REQUEST_ERROR",
                 error_message=f"Request failed: {str(e)}",
@@ -126,27 +145,37 @@ class TraineeService:
                 error_data={"exception": str(e)}
             )
 
-    def _insert_user_and_alluser(self, user_data: Dict) -> Union[Tuple[str, str], Dict[str, Any]]:
+    async def _insert_user_and_alluser(self, user_data: Dict) -> Union[Tuple[str, str], Dict[str, Any]]:
         """Insert user into both users and allusers tables"""
         
         try:
             if user_data['is_mock']:
-                result_json = self.cm.create_user(self.sg, user_data)
+                result_json = await self.client.create_user(user_data)
                 user_id = result_json['data']['register']['user']['id']
             else:
-                result_json = self.create_unconfirmed_user(user_data)
+                result_json = await self.create_unconfirmed_user(user_data)
+                if result_json.get('success') is False:
+                    return result_json
                 user_id = result_json['user']['id']
             print("user_id...", user_id)
             
             self.created_resources['user_id'] = user_id
-        except Exception as e:
-            self._cleanup_resources('user')
+        except StrapiConflictError:
             return TraineeResponse.error_response(
                 error_type="USER_CREATION_ERROR",
                 error_message="Duplicate email address",
                 error_location="user_creation",
                 error_data=user_data
             )
+        except StrapiTransientError as e:
+            return self._unavailable_response(e, "user_creation", user_data)
+        except Exception as e:
+            return TraineeResponse.error_response(
+                error_type="USER_CREATION_ERROR",
+                error_message=str(e),
+                error_location="user_creation",
+                error_data=user_data
+            )
         
         try:
             # Create alluser 
@@ -160,14 +189,16 @@ class TraineeService:
                 "groups": groups
             }
             print("alluser_data...", alluser_data)
-            alluser_result = self.cm.insert_all_users(self.sg, alluser_data)
+            alluser_result = await self.client.insert_all_users(alluser_data)
             alluser_id = alluser_result['data']['createAllUser']['data']['id']
             print("alluser_id...", alluser_id)
             self.created_resources['alluser_id'] = alluser_id
             return user_id, alluser_id
 
+        except StrapiTransientError as e:
+            return self._unavailable_response(e, "alluser_creation", alluser_data)
         except Exception as e:
-            self._cleanup_resources('alluser')
+            await self._cleanup_resources('alluser')
             return TraineeResponse.error_response(
                 error_type="ALLUSER_CREATION_ERROR",
                 error_message=str(e),
@@ -175,15 +206,17 @@ class TraineeService:
                 error_data=alluser_data
             )
 
-    def _insert_profile(self, profile_data: Dict) -> Dict:
+    async def _insert_profile(self, profile_data: Dict) -> Dict:
         """Insert profile information"""
         try:
-            result = self.cm.insert_profile_information(self.sg, profile_data)
+            result = await self.client.insert_profile_information(profile_data)
             if result and 'id' in result['data']['createProfileInformation']['data']:
                 self.created_resources['profile_id'] = result['data']['createProfileInformation']['data']['id']
             return result
+        except StrapiTransientError as e:
+            return self._unavailable_response(e, "profile_creation", profile_data)
         except Exception as e:
-            self._cleanup_resources('profile')
+            await self._cleanup_resources('profile')
             return TraineeResponse.error_response(
                 error_type="PROFILE_CREATION_ERROR",
                 error_message=str(e),
@@ -191,15 +224,17 @@ class TraineeService:
                 error_data=profile_data
             )
 
-    def _insert_trainee(self, trainee_data: Dict) -> Dict:
+    async def _insert_trainee(self, trainee_data: Dict) -> Dict:
         """Insert trainee information"""
         try:
-            result = self.sm.insert_data(trainee_data, "trainees")
+            result = await self.client.insert_data(trainee_data, "trainees")
             if result and 'id' in result:
                 self.created_resources['trainee_id'] = result['id']
             return result
+        except StrapiTransientError as e:
+            return self._unavailable_response(e, "trainee_creation", trainee_data)
         except Exception as e:
-            self._cleanup_resources('trainee')
+            await self._cleanup_resources('trainee')
             return TraineeResponse.error_response(
                 error_type="TRAINEE_CREATION_ERROR",
                 error_message=str(e),
@@ -207,7 +242,7 @@ class TraineeService:
                 error_data=trainee_data
             )
 
-    def create_trainee_services(self) -> Dict[str, Any]:
+    async def create_trainee_services(self) -> Dict[str, Any]:
         """Create a new trainee with all related information"""
         try:
             
@@ -233,7 +268,7 @@ class TraineeService:
                 "is_mock": processed_data['is_mock']
             }
             
-            user_result = self._insert_user_and_alluser(user_data)
+            user_result = await self._insert_user_and_alluser(user_data)
             if isinstance(user_result, dict):
                 return user_result
 
@@ -256,7 +291,7 @@ class TraineeService:
                 "city_of_residence": processed_data.get('city_of_residence', '')
             }
             print("profile_data...", profile_data)
-            profile_result = self._insert_profile(profile_data)
+            profile_result = await self._insert_profile(profile_data)
             if isinstance(profile_result, dict) and 'error' in profile_result:
                 return profile_result
 
@@ -268,7 +303,7 @@ class TraineeService:
                 "batch": processed_data['batch_id'],
                 "all_user": alluser_id
             }
-            trainee_result = self._insert_trainee(trainee_data)
+            trainee_result = await self._insert_trainee(trainee_data)
             if isinstance(trainee_result, dict) and 'error' in trainee_result:
                 return trainee_result
 
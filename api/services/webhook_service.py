@@ -9,10 +9,12 @@ import logging
 import pandas as pd
 import math
 
+from api.core.http_clients import get_webhook_client
+
 logger = logging.getLogger(__name__)
 
 class WebhookService:
-    def __init__(self, config):
+    def __init__(self, config, client: Optional[httpx.AsyncClient] = None):
         if not config.callback_url:
             raise ValueError("callback_url is required for webhook service")
             
@@ -22,6 +24,8 @@ class WebhookService:
         self.webhook_headers = config.webhook_headers or {}
         self.retry_count = max(1, min(config.webhook_retry_count or 1, 10))
         self.retry_delay = max(1, min(config.webhook_retry_delay or 1, 60))
+        # shared keep-alive client; resolved lazily when not injected
+        self.client = client
         
         logger.info(f"Webhook service initialized for {self.callback_url}")
 
@@ -114,25 +118,25 @@ class WebhookService:
 
         retry_count = self.retry_count
         retry_delay = self.retry_delay
+        client = self.client if self.client is not None and not self.client.is_closed else get_webhook_client()
 
         for attempt in range(retry_count):
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        self.callback_url,
-                        json=payload,
-                        headers=headers
+                response = await client.post(
+                    self.callback_url,
+                    json=payload,
+                    headers=headers
+                )
+                
+                if response.status_code in [200, 201, 202]:
+                    logger.info(f"Webhook delivered successfully on attempt {attempt + 1}")
+                    return True
+                else:
+                    logger.warning(
+                        f"Webhook delivery failed with status {response.status_code} "
+                        f"on attempt {attempt + 1}. Response: {response.text}"
                     )
                     
-                    if response.status_code in [200, 201, 202]:
-                        logger.info(f"Webhook delivered successfully on attempt {attempt + 1}")
-                        return True
-                    else:
-                        logger.warning(
-                            f"Webhook delivery failed with status {response.status_code} "
-                            f"on attempt {attempt + 1}. Response: {response.text}"
-                        )
-                        
             except httpx.TimeoutException:
                 logger.warning(f"Webhook delivery attempt {attempt + 1} timed out")
             except Exception as e:
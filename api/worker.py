@@ -0,0 +1,158 @@
+"""
+Batch job worker: runs the batches /trainee/batch enqueues when
+JOB_EXECUTOR=queue, outside the API processes.
+
+    python -m api.worker --concurrency 2
+
+Each process runs up to `--concurrency` jobs at once on its own event loop;
+scale by starting more processes. SIGINT / SIGTERM stop claiming new jobs
+and let running ones finish.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import traceback
+import uuid
+
+from api.core.config import get_settings
+from api.core.http_clients import close_http_clients
+from api.core.logging_config import setup_logging
+from api.core.warmup import warm_up
+from api.services.batch_service import BatchService
+from api.services.job_queue import get_job_queue
+from api.services.job_store import get_job_store
+
+logger = setup_logging()
+
+
+class Worker:
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.settings = get_settings()
+        self.queue = get_job_queue()
+        self.store = get_job_store()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.slots = asyncio.Semaphore(concurrency)
+        self.poll_interval = poll_interval
+        self.stopping = asyncio.Event()
+        self.running = set()
+
+    def stop(self):
+        print(f"Worker {self.worker_id} stopping, waiting for {len(self.running)} running job(s)")
+        self.stopping.set()
+
+    async def run(self, once: bool = False):
+        """Claim and run jobs until stopped (or, with once, until the queue is empty)"""
+        print(f"Worker {self.worker_id} started")
+        while not self.stopping.is_set():
+            await self._requeue_stale()
+            await self.slots.acquire()
+            if self.stopping.is_set():
+                self.slots.release()
+                break
+            claimed = await asyncio.to_thread(self.queue.claim, self.worker_id)
+            if claimed is None:
+                self.slots.release()
+                if once and not self.running:
+                    break
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run_job(*claimed))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+
+    async def _requeue_stale(self):
+        try:
+            abandoned = await asyncio.to_thread(self.queue.requeue_stale, self.settings.JOB_LEASE_TIMEOUT,
+                                                self.settings.JOB_MAX_ATTEMPTS)
+            for job_id in abandoned:
+                await asyncio.to_thread(self.store.finish, job_id, 'failed',
+                                        f"Gave up after {self.settings.JOB_MAX_ATTEMPTS} attempts")
+        except Exception as e:
+            logger.error("Failed to requeue stale jobs", extra={'error': str(e)})
+
+    async def _heartbeat(self, job_id):
+        """Extend the job's lease until cancelled; returns when the lease is lost"""
+        interval = self.settings.JOB_LEASE_TIMEOUT / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                owned = await asyncio.to_thread(self.queue.heartbeat, job_id, self.worker_id)
+            except Exception as e:
+                logger.error("Job heartbeat failed", extra={'job_id': job_id, 'error': str(e)})
+                continue
+            if not owned:
+                return
+
+    async def _run_job(self, job_id, batch_create, attempt):
+        print(f"Worker {self.worker_id} running job {job_id} (attempt {attempt})")
+        job = asyncio.create_task(self._process(job_id, batch_create, attempt))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await asyncio.wait({job, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+            if not job.done():
+                # the job was requeued (missed lease) and may already run elsewhere: stop
+                # creating users here; the store drops any write of this superseded attempt
+                logger.error("Job lease lost, cancelling", extra={'job_id': job_id, 'worker': self.worker_id})
+                job.cancel()
+                await asyncio.gather(job, return_exceptions=True)
+                return
+            if not await asyncio.to_thread(self.queue.complete, job_id, self.worker_id):
+                logger.error("Job was requeued before it completed", extra={
+                    'job_id': job_id,
+                    'worker': self.worker_id
+                })
+        finally:
+            heartbeat.cancel()
+            job.cancel()
+            self.slots.release()
+
+    async def _process(self, job_id, batch_create, attempt):
+        try:
+            service = BatchService(batch_create, job_id=job_id, attempt=attempt)
+            results = await service.process_batch_trainees()
+            logger.info("Batch job completed", extra={
+                'job_id': job_id,
+                'total_processed': results.get('total_processed', 0),
+                'successful': results.get('successful', 0),
+                'failed': results.get('failed', 0),
+                'status': results.get('status', 'unknown')
+            })
+        except Exception as e:
+            # process_batch_trainees reports its own failures; this is construction errors
+            await asyncio.to_thread(self.store.finish, job_id, 'failed', str(e), attempt=attempt)
+            logger.error("Batch job failed", extra={
+                'job_id': job_id,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            })
+
+async def main(concurrency: int, poll_interval: float, once: bool = False):
+    await warm_up()
+    worker = Worker(concurrency, poll_interval)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run(once=once)
+    finally:
+        await close_http_clients()
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run queued batch jobs")
+    parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                        help="jobs run at once by this process")
+    parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+                        help="seconds between polls of an empty queue")
+    parser.add_argument('--once', action='store_true', help="exit when the queue is empty")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.poll_interval, args.once))
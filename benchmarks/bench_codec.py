@@ -0,0 +1,80 @@
+"""
+Microbenchmark of the Strapi json codec on review payloads.
+
+Builds `reviews` bodies shaped like the ones InsertAllUsers sends (a
+`prefilled_response` list of question/answer dicts per applicant) and times
+encoding and decoding with stdlib json and with the active codec.
+
+    python benchmarks/bench_codec.py --rows 200 --questions 40 --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+curdir = os.path.dirname(os.path.realpath(__file__))
+cpath = os.path.dirname(curdir)
+if not cpath in sys.path:
+    sys.path.append(cpath)
+
+from review_scripts import json_codec
+
+QUESTION_TYPES = ['textbox', 'textarea', 'date', 'multi-select', 'radio']
+LONG_ANSWER = ("I have completed several online courses in data science and machine learning, "
+               "built end-to-end projects with pandas and scikit-learn and mentored peers. ") * 8
+
+
+def review_payload(index, questions):
+    prefilled = []
+    for q in range(questions):
+        qtype = QUESTION_TYPES[q % len(QUESTION_TYPES)]
+        answer = LONG_ANSWER if qtype == 'textarea' else f"answer {index}-{q}"
+        prefilled.append({
+            "type": qtype,
+            "label": f"Question {q}: please describe your experience with topic {q}?",
+            "answer": answer,
+            "required": "true"
+        })
+    return {"data": {
+        "status": "Not_reviewed",
+        "prefilled_response": prefilled,
+        "all_user": index,
+        "review_category": 6,
+        "reviewers": [8, 10, 16, 11, 30, 15],
+        "grade": index
+    }}
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--questions', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = [review_payload(i, args.questions) for i in range(args.rows)]
+    encoded = [stdlib_dumps(p) for p in payloads]
+    size = sum(len(e) for e in encoded)
+    print(f"{args.rows} payloads, {size / 1024:.0f} KiB, active codec: {json_codec.CODEC}")
+
+    cases = [
+        ('encode stdlib json', lambda: [stdlib_dumps(p) for p in payloads]),
+        (f'encode {json_codec.CODEC}', lambda: [json_codec.dumps(p) for p in payloads]),
+        ('decode stdlib json', lambda: [json.loads(e) for e in encoded]),
+        (f'decode {json_codec.CODEC}', lambda: [json_codec.loads(e) for e in encoded]),
+        # old insert_table path: parse, then json.dumps(indent=2) for the caller to parse again
+        ('decode + re-serialise (old)', lambda: [json.loads(json.dumps(json.loads(e), indent=2))
+                                                  for e in encoded]),
+    ]
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:30s} {best * 1000:8.2f} ms  {size / best / 1e6:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark of run_stage resolution in the auth dependency on large uploads.
+
+Posts a multipart CSV (like /trainee/batch) and compares the old resolution
+(always parse the body in the dependency) with resolve_run_stage using the
+X-Run-Stage header. Two setups are timed:
+
+  dependency   the dependency alone on a fresh request, as on the auth path
+               before the route has read the body
+  route        a FastAPI route with File/Form parameters, end to end
+
+For each, the best wall time and the tracemalloc peak of one request are
+reported.
+
+    python benchmarks/bench_run_stage.py --size-mb 10 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+curdir = os.path.dirname(os.path.realpath(__file__))
+cpath = os.path.dirname(curdir)
+if not cpath in sys.path:
+    sys.path.append(cpath)
+
+from fastapi import Depends, FastAPI, File, Form, Request, UploadFile
+from fastapi.testclient import TestClient
+from starlette.requests import Request as StarletteRequest
+
+from api.core.auth import RUN_STAGE_HEADER, resolve_run_stage
+
+BOUNDARY = "----benchboundary"
+
+
+async def legacy_run_stage(request: Request):
+    """run_stage resolution as get_current_user did it before"""
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "multipart/form-data" in content_type:
+            form_data = await request.form()
+            return form_data.get("run_stage")
+        json_data = await request.json()
+        return json_data.get("config", {}).get("run_stage")
+    except:
+        return "dev"
+
+
+def csv_upload(size_mb):
+    row = b"Jane Doe,jane.doe@example.com,Ethiopian,F,1999-01-01,no,bio text here,Addis Ababa\n"
+    rows = row * (size_mb * 1024 * 1024 // len(row))
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"run_stage\"\r\n\r\ndev\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"t.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n".encode() + b"name,email,nationality,gender,date_of_birth,vulnerable,bio,city\n"
+        + rows + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+def make_request(chunks, header):
+    headers = [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+               (b"content-length", str(sum(len(c) for c in chunks)).encode())]
+    if header:
+        headers.append((RUN_STAGE_HEADER.lower().encode(), b"dev"))
+    pending = iter(range(len(chunks)))
+
+    async def receive():
+        i = next(pending, None)
+        if i is not None:
+            return {"type": "http.request", "body": chunks[i], "more_body": i < len(chunks) - 1}
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": "POST", "path": "/trainee/batch", "query_string": b"",
+             "headers": headers}
+    return StarletteRequest(scope, receive)
+
+
+async def dependency_once(resolver, chunks, header):
+    request = make_request(chunks, header)
+    started = time.perf_counter()
+    stage = await resolver(request)
+    elapsed = time.perf_counter() - started
+    form = getattr(request, "_form", None)
+    if form is not None:
+        await form.close()
+    return stage, elapsed
+
+
+def make_app(resolver):
+    app = FastAPI()
+
+    @app.post("/trainee/batch")
+    async def batch(file: UploadFile = File(...), run_stage: str = Form("dev"),
+                    stage: str = Depends(resolver)):
+        content = await file.read()
+        return {"stage": stage, "size": len(content)}
+
+    return app
+
+
+def measure(fn, repeat):
+    best = min(_timed(fn) for _ in range(repeat))
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    body = csv_upload(args.size_mb)
+    chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+    print(f"multipart body: {len(body) / 1024 / 1024:.1f} MiB")
+
+    cases = [('legacy (parse body)', legacy_run_stage, False),
+             ('X-Run-Stage header', resolve_run_stage, True)]
+
+    for name, resolver, header in cases:
+        best, peak = measure(lambda: asyncio.run(dependency_once(resolver, chunks, header)), args.repeat)
+        print(f"dependency  {name:22s} {best * 1000:9.2f} ms  peak {peak / 1024 / 1024:7.2f} MiB")
+
+    for name, resolver, header in cases:
+        client = TestClient(make_app(resolver))
+        headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if header:
+            headers[RUN_STAGE_HEADER] = "dev"
+        post = lambda: client.post("/trainee/batch", content=body, headers=headers).raise_for_status()
+        best, peak = measure(post, args.repeat)
+        print(f"route       {name:22s} {best * 1000:9.2f} ms  peak {peak / 1024 / 1024:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
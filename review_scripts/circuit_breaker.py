@@ -0,0 +1,89 @@
+import threading
+import time
+
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+from review_scripts.strapi_errors import StrapiCircuitOpenError
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker shared by every Strapi client of a stage.
+
+    After `threshold` transient failures in a row the circuit opens and calls
+    fail immediately with StrapiCircuitOpenError. Once `reset_timeout` seconds
+    have passed a single probe call is let through (half-open): success closes
+    the circuit, failure opens it again. A probe must end in
+    record_success(), record_failure() or, when it ended without an answer
+    from Strapi (cancelled, local error), release_probe(); otherwise the
+    probe slot stays taken.
+    """
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None and \
+            time.monotonic() - self.opened_at < self.reset_timeout
+
+    def before_call(self):
+        """
+        Raise StrapiCircuitOpenError unless the call may go through.
+
+        Returns:
+            bool: True when the call is the half-open probe
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self._probing:
+                self._probing = True
+                return True
+        raise StrapiCircuitOpenError("Strapi circuit is open, call skipped")
+
+    def release_probe(self):
+        """Free the probe slot without counting a failure, so the next call probes"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(run_stage=None, pool='default'):
+    """
+    Process-wide CircuitBreaker for the Strapi root of a run_stage.
+
+    `pool='auth'` keeps the `me` checks apart: an open data breaker does not
+    reject logins, and failed logins do not open it.
+    """
+    root, _ = get_strapi_params(run_stage or strapi_stage)
+    key = (root, pool)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(key)
+            if breaker is None:
+                settings = get_settings()
+                breaker = CircuitBreaker(settings.STRAPI_BREAKER_THRESHOLD,
+                                         settings.STRAPI_BREAKER_RESET)
+                _breakers[key] = breaker
+    return breaker
@@ -1,33 +1,20 @@
-class CommunicationManager:
-    """All strapi queries are called from here"""
-    def __init__(self):
-        pass
-    
-    def create_user(self, sg, user_data):
-        """
-        Create a new user using the provided user data and return the result in JSON format.
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 
-        Parameters:
-            sg: graphql object for interacting with the database
-            user_data: a dictionary containing user's username and email
+from api.core.config import get_settings
+from review_scripts.strapi_cache import get_strapi_cache
+from review_scripts.persisted_queries import register
+from review_scripts.strapi_errors import (StrapiCircuitOpenError, StrapiConflictError, StrapiError,
+                                          StrapiTransientError, StrapiValidationError)
 
-        Returns:
-            result_json: the result of the user creation in JSON format
-        """
-        
-        query = """mutation createUser($username:String!,$email:String!, $password:String!) 
+
+# Documents shared by CommunicationManager and the async Strapi client
+CREATE_USER_MUTATION = """mutation createUser($username:String!,$email:String!, $password:String!) 
                     { register(input: { username: $username, email: $email, password: $password } ) 
                     { user { id username email }  } }"""
-        username = user_data['name']+"_"+ user_data['email']
 
-        variables = {"username": username, "email":user_data['email'], "password":user_data['password']}
-        print("user data variables.....",variables)
-        result_json = sg.Select_from_table(query=query, variables= variables)
-        print("user data result json.....",result_json)
-        return result_json
-    
-    def insert_all_users(self,sg, all_user_data):  
-        query = """mutation createAllUser(
+CREATE_ALL_USER_MUTATION = """mutation createAllUser(
                 $email: String
                 $userId: ID
                 $name: String
@@ -52,46 +39,344 @@ class CommunicationManager:
                 }
 
                     """
-        variables =  {"email": all_user_data['email'],"name":all_user_data['name'],
-               
-                        "userId": all_user_data['userId'], 
-                        "role":all_user_data['role'],
-                        "batchId": all_user_data['batchId'],
-                        "groups": all_user_data['groups']
+
+CREATE_PROFILE_INFORMATION_MUTATION = """mutation createProfileInformation(
+            $firstName: String
+            $surName: String
+            $nationality: String
+            $gender:String
+            $email:String
+  			$date_of_birth:Date
+            $all_user:ID
+  			$other_info:JSON
+            $bio:String
+            $city_of_residence:String
+        ) {
+            createProfileInformation(
+            data: {
+                first_name: $firstName
+                surname: $surName
+                nationality: $nationality
+                gender:$gender
+                all_user:$all_user
+                email:$email
+              	date_of_birth:$date_of_birth
+              	other_info: $other_info
+                bio:$bio
+                city_of_residence:$city_of_residence
+            }
+            ) {
+            data {
+                id
+            }
+            }
+        }"""
+
+CREATE_TRAINEE_MUTATION = """mutation createTrainees(
+                    $email: String
+                    $alluser: ID
+                    $traineeID: String
+                    $batch: ID
+                    ) {
+                    createTrainee(
+                        data: {
+                        email: $email
+                        Status: Accepted
+                        all_user: $alluser
+                        trainee_id: $traineeID
+                        batch:$batch
                         }
+                    ) {
+                        data {
+                        id
+                        }
+                    }
+                    }"""
+
+CREATE_REVIEWER_MUTATION = """mutation createReviewer($allUserID:ID,$email:String,$batch:[ID]){
+            createReviewer(data:{all_user:$allUserID,Email:$email,batches:$batch}){
+                data{
+                id
+                attributes{
+                    Email
+                }
+                }
+            }
+            }"""
+
+CREATE_PREFERENCE_MUTATION = """mutation createPreference(
+                $mainUserID: ID
+                $email: String
+                $defaultSettings: JSON
+                ) {
+                createPreference(
+                    data: {
+                    defaultSettings: $defaultSettings
+                    email: $email
+                    users_permissions_user: $mainUserID
+                    }
+                ){
+                    data{
+                    id
+                    }
+                }
+                }"""
+
+DELETE_USER_MUTATION = """
+        mutation deleteUser($id: ID!) {
+            deleteUsersPermissionsUser(id: $id) {
+                data {
+                    id
+                }
+            }
+        }
+        """
+
+DELETE_ALL_USER_MUTATION = """
+        mutation deleteAllUser($id: ID!) {
+            deleteAllUser(id: $id) {
+                data {
+                    id
+                }
+            }
+        }
+        """
+
+DELETE_PROFILE_MUTATION = """
+        mutation deleteProfile($id: ID!) {
+            deleteProfile(id: $id) {
+                data {
+                    id
+                }
+            }
+        }
+        """
+
+DELETE_TRAINEE_MUTATION = """
+        mutation deleteTrainee($id: ID!) {
+            deleteTrainee(id: $id) {
+                data {
+                    id
+                }
+            }
+        }
+        """
+
+AUTH_ME_QUERY = """
+                    query {
+                        me {
+                        id
+                username
+                email
+                role {
+                name
+                }
+            }
+            }
+            """
+
+
+# minify + sha256 the shared documents once, at import
+register(CREATE_USER_MUTATION, CREATE_ALL_USER_MUTATION, CREATE_PROFILE_INFORMATION_MUTATION,
+         CREATE_TRAINEE_MUTATION, CREATE_REVIEWER_MUTATION, CREATE_PREFERENCE_MUTATION,
+         DELETE_USER_MUTATION, DELETE_ALL_USER_MUTATION, DELETE_PROFILE_MUTATION,
+         DELETE_TRAINEE_MUTATION, AUTH_ME_QUERY)
+
+
+def user_variables(user_data):
+    """Variables for CREATE_USER_MUTATION"""
+    username = user_data['name']+"_"+ user_data['email']
+    return {"username": username, "email":user_data['email'], "password":user_data['password']}
+
+
+def all_user_variables(all_user_data):
+    """Variables for CREATE_ALL_USER_MUTATION"""
+    return {"email": all_user_data['email'],"name":all_user_data['name'],
+               
+            "userId": all_user_data['userId'], 
+            "role":all_user_data['role'],
+            "batchId": all_user_data['batchId'],
+            "groups": all_user_data['groups']
+            }
+
+
+def profile_variables(row):
+    """Variables for CREATE_PROFILE_INFORMATION_MUTATION"""
+    return { "firstName": row['first_name'],
+            "surName": row['last_name'],
+            "nationality": row["nationality"],
+            "gender": row["gender"],
+            "all_user": row["all_user"],
+            "email": row["email"],
+            "other_info": row["other_info"],
+            "date_of_birth": row["date_of_birth"],
+            "bio": row["bio"],
+            "city_of_residence": row["city_of_residence"]
+            }
+
+
+def reviewer_variables(reviewer_data):
+    """Variables for CREATE_REVIEWER_MUTATION"""
+    return {"allUserID": reviewer_data['all_user'],
+            "email": reviewer_data['Email'], 
+            "batch": reviewer_data['batches']}
+
+
+def preference_variables(user_preference_data):
+    """Variables for CREATE_PREFERENCE_MUTATION"""
+    return {"mainUserID":user_preference_data['main_user_id'],
+            "email": user_preference_data['email'],
+            "defaultSettings":user_preference_data['defaultSettings']}
+
+
+def aliased_document(document, count):
+    """
+    Repeat the single mutation of `document` `count` times as aliased fields.
+
+    Every copy gets the alias a<i> and its variables are renamed to
+    $a<i>_<name>, so one request can carry many inserts/deletes.
+
+    Args:
+        document (str): graphql document holding exactly one mutation field
+        count (int): number of aliased copies
+
+    Returns:
+        str: the combined mutation document
+    """
+    head, _, rest = document.partition('(')
+    var_defs, _, rest = rest.partition(')')
+    body = rest[rest.index('{') + 1:rest.rindex('}')].strip()
+    name = head.split()[-1]
+
+    defs, fields = [], []
+    for i in range(count):
+        prefix = f"a{i}_"
+        defs.append(re.sub(r'\$(\w+)', lambda m: f"${prefix}{m.group(1)}", var_defs.strip()))
+        fields.append(f"a{i}: " + re.sub(r'\$(\w+)', lambda m: f"${prefix}{m.group(1)}", body))
+    return "mutation bulk_{}({}) {{ {} }}".format(name, " ".join(defs), " ".join(fields))
+
+
+def _mutation_result(status, data, errors):
+    """One row of run_aliased_mutations"""
+    return {'status': status, 'data': data, 'errors': errors}
+
+
+# Default record selections of the roster queries, as dotted paths (the
+# column names pd.json_normalize gives them). Callers can pass a smaller set.
+ALL_USER_FIELDS = ('id', 'attributes.name', 'attributes.email', 'attributes.Batch',
+                   'attributes.user.data.id', 'attributes.user.data.attributes.email')
+TRAINEE_FIELDS = ('attributes.email', 'attributes.all_user.data.id',
+                  'attributes.all_user.data.attributes.email')
+REVIEWER_FIELDS = ('id', 'attributes.Email')
+# what the group / reviewer / trainee roster builders actually use
+ROSTER_FIELDS = ('id', 'attributes.email', 'attributes.Batch')
+USER_WITHOUT_ALLUSER_FIELDS = ('id', 'attributes.email', 'attributes.username',
+                               'attributes.all_users.data.attributes.name')
+
+
+def selection_set(fields):
+    """
+    Build a graphql selection from dotted field paths.
+
+    Args:
+        fields (iterable): e.g. ('id', 'attributes.user.data.id')
+
+    Returns:
+        str: e.g. "id attributes{user{data{id}}}"
+    """
+    tree = {}
+    for path in fields:
+        node = tree
+        for part in path.split('.'):
+            node = node.setdefault(part, {})
+
+    def render(node):
+        return " ".join(name + ("{" + render(child) + "}" if child else "")
+                        for name, child in node.items())
+    return render(tree)
+
+
+def projected(query, fields):
+    """Fill the __FIELDS__ placeholder of a collection query with a selection"""
+    return query.replace('__FIELDS__', selection_set(fields))
+
+
+def collection_response(collection, records):
+    """Rebuild the graphql response shape of a collection from streamed records"""
+    records = list(records)
+    return {'data': {collection: {'meta': {'pagination': {'total': len(records)}},
+                                  'data': records}}}
+
+
+class CommunicationManager:
+    """All strapi queries are called from here"""
+    def __init__(self):
+        # batches and reviewers rarely change, their lookups are cached per Strapi root
+        self.cache = get_strapi_cache()
+
+    def _cached(self, key, loader):
+        """Read-through cache lookup that never stores graphql error answers"""
+        return self.cache.get_or_load(key, loader,
+                                      cacheable=lambda r: isinstance(r, dict) and not r.get('errors'))
+
+    def invalidate_cache(self, sg=None, namespace=None):
+        """
+        Drop cached lookups: one namespace ('batch', 'batch_id', 'reviewers')
+        or all of them, for the Strapi root of `sg` or for every root.
+        """
+        namespaces = [namespace] if namespace else ['batch', 'batch_id', 'reviewers']
+        for ns in namespaces:
+            if sg is None:
+                self.cache.invalidate(ns)
+            else:
+                self.cache.invalidate(ns, sg.apiroot)
+    
+    def create_user(self, sg, user_data):
+        """
+        Create a new user using the provided user data and return the result in JSON format.
+
+        Parameters:
+            sg: graphql object for interacting with the database
+            user_data: a dictionary containing user's username and email
+
+        Returns:
+            result_json: the result of the user creation in JSON format
+        """
+        
+        query = CREATE_USER_MUTATION
+        variables = user_variables(user_data)
+        print("user data variables.....",variables)
+        result_json = sg.Select_from_table(query=query, variables= variables)
+        print("user data result json.....",result_json)
+        return result_json
+    
+    def insert_all_users(self,sg, all_user_data):  
+        query = CREATE_ALL_USER_MUTATION
+        variables = all_user_variables(all_user_data)
 
         result_json = sg.Select_from_table(query=query, variables= variables)
         print("all user data result json.....",result_json)
         return result_json
-    def read_all_users(self,sg, req_params):
-        query = """ query getAllUser($batch:Int,$role:String){
-                allUsers(pagination:{start:0, limit:2000} filters:{Batch:{eq:$batch}, role:{eq:$role}}){
+    def iter_all_users(self, sg, req_params, fields=ALL_USER_FIELDS, **kwargs):
+        """Stream every allUser of a batch and role, page by page (only `fields` are selected)"""
+        query = """ query getAllUser($batch:Int,$role:String,$start:Int,$limit:Int){
+                allUsers(pagination:{start:$start, limit:$limit} sort:"id:asc" filters:{Batch:{eq:$batch}, role:{eq:$role}}){
                     meta{
                     pagination{
                         total
                     }
                     }
                     data{
-                    id
-                    attributes{
-                        name
-                        email
-                        Batch
-                      	user{
-                          data{
-                            id
-                            attributes{
-                              email
-                            }
-                          }
-                        }
-                    }
+                    __FIELDS__
                     }
                 }
                 }
             """
-        result_json = sg.Select_from_table(query=query, variables={"batch":req_params['batch'], "role": req_params['role']})
-        return result_json
+        return self.iter_collection(sg, projected(query, fields), 'allUsers',
+                                    {"batch":req_params['batch'], "role": req_params['role']}, **kwargs)
+
+    def read_all_users(self,sg, req_params, fields=ALL_USER_FIELDS):
+        return collection_response('allUsers', self.iter_all_users(sg, req_params, fields))
     
     def create_new_batch (self, sg,  batchparams ):
         """
@@ -127,6 +412,7 @@ class CommunicationManager:
         result_json = sg.Select_from_table(query=query, variables={"batch":batchparams['batch'], "class_link":batchparams['class_link'], 
                                                                    "communication_link":batchparams['communication_link'], 
                                                                    "additional_info":batchparams['additional_info']}) 
+        self.invalidate_cache(sg, 'batch')
         return result_json
     
 
@@ -146,7 +432,10 @@ class CommunicationManager:
 
             """
         # batch = int(self.batch.split("-")[1])
-        batchJson = sg.Select_from_table(query=bquery, variables={"batch": batch_params['batch']})
+        batch = batch_params['batch']
+        batchJson = self._cached(
+            ('batch', sg.apiroot, batch),
+            lambda: sg.Select_from_table(query=bquery, variables={"batch": batch}))
         return batchJson
     
     def read_batch_from_batch_ID(self, sg, batch_id):
@@ -161,45 +450,19 @@ class CommunicationManager:
                 }
             }
             }"""
-        batchJson = sg.Select_from_table(query=query, variables={"batch_ID": batch_id})
+        batchJson = self._cached(
+            ('batch_id', sg.apiroot, str(batch_id)),
+            lambda: sg.Select_from_table(query=query, variables={"batch_ID": batch_id}))
      
         return batchJson
     def create_reviewer(self, sg, reviewer_data):
-        query = """mutation createReviewer($allUserID:ID,$email:String,$batch:[ID]){
-            createReviewer(data:{all_user:$allUserID,Email:$email,batches:$batch}){
-                data{
-                id
-                attributes{
-                    Email
-                }
-                }
-            }
-            }"""
-        result_json = sg.Select_from_table(query=query,variables =  {"allUserID": reviewer_data['all_user'],
-                                                                     "email": reviewer_data['Email'], 
-                                                                     "batch": reviewer_data['batches']})
+        query = CREATE_REVIEWER_MUTATION
+        result_json = sg.Select_from_table(query=query,variables = reviewer_variables(reviewer_data))
+        self.invalidate_cache(sg, 'reviewers')
         return result_json
     def create_user_preference(self, sg, user_preference_data):
-        query = """mutation createPreference(
-                $mainUserID: ID
-                $email: String
-                $defaultSettings: JSON
-                ) {
-                createPreference(
-                    data: {
-                    defaultSettings: $defaultSettings
-                    email: $email
-                    users_permissions_user: $mainUserID
-                    }
-                ){
-                    data{
-                    id
-                    }
-                }
-                }"""
-        result_json = sg.Select_from_table(query=query, variables= {"mainUserID":user_preference_data['main_user_id'],
-                                                                     "email": user_preference_data['email'],
-                                                                     "defaultSettings":user_preference_data['defaultSettings']})
+        query = CREATE_PREFERENCE_MUTATION
+        result_json = sg.Select_from_table(query=query, variables= preference_variables(user_preference_data))
         return result_json
     def create_group_for_staff(self, sg, group_params):
         """Don't run as it is check for the default value """
@@ -213,114 +476,65 @@ class CommunicationManager:
         groupJson = sg.Select_from_table(query=query, variables={"alluserIDS": group_params['alluserIDS']})
         return groupJson
     
-    def read_batch_specific_reviewers(self, sg, batch):
-        """
-            Function to get current batch from strapi graphql
-
-        Args:
-            Self.batch (Int): Number that represent current batch 
-
-        Returns:
-            Strapi Id of the imputed batch 
-        """
+    def iter_batch_specific_reviewers(self, sg, batch, fields=REVIEWER_FIELDS, **kwargs):
+        """Stream every reviewer of a batch, page by page (only `fields` are selected)"""
         bquery = """
 
-            query getReviewer($batch: Int) {
+            query getReviewer($batch: Int, $start: Int, $limit: Int) {
                     reviewers(
-                        pagination: { start: 0, limit: 100 }
+                        pagination: { start: $start, limit: $limit }
+                        sort: "id:asc"
                         filters: { batches: { Batch: { eq: $batch } } }
                     ) {
-                        data {
-                        id
-                        attributes {
-                            Email
+                        meta {
+                        pagination {
+                            total
+                        }
                         }
+                        data {
+                        __FIELDS__
                         }
                     }
                     }
             """
-        batchJson = sg.Select_from_table(query=bquery, variables={"batch": batch})
-        return batchJson
+        return self.iter_collection(sg, projected(bquery, fields), 'reviewers', {"batch": batch}, **kwargs)
+
+    def read_batch_specific_reviewers(self, sg, batch, fields=REVIEWER_FIELDS):
+        """
+            Function to get current batch from strapi graphql
+
+        Args:
+            Self.batch (Int): Number that represent current batch 
+
+        Returns:
+            Strapi Id of the imputed batch 
+        """
+        return self._cached(
+            ('reviewers', sg.apiroot, batch, tuple(sorted(fields))),
+            lambda: collection_response('reviewers', self.iter_batch_specific_reviewers(sg, batch, fields)))
     
    
     def insert_profile_information(self, sg, row):
-        query = """mutation createProfileInformation(
-            $firstName: String
-            $surName: String
-            $nationality: String
-            $gender:String
-            $email:String
-  			$date_of_birth:Date
-            $all_user:ID
-  			$other_info:JSON
-            $bio:String
-            $city_of_residence:String
-        ) {
-            createProfileInformation(
-            data: {
-                first_name: $firstName
-                surname: $surName
-                nationality: $nationality
-                gender:$gender
-                all_user:$all_user
-                email:$email
-              	date_of_birth:$date_of_birth
-              	other_info: $other_info
-                bio:$bio
-                city_of_residence:$city_of_residence
-            }
-            ) {
-            data {
-                id
-            }
-            }
-        }"""
+        query = CREATE_PROFILE_INFORMATION_MUTATION
         print("profile row ......", row)    
      
       
-        result_json = sg.Select_from_table(query=query, variables= { "firstName": row['first_name'],
-                                                                        "surName": row['last_name'],
-                                                                        "nationality": row["nationality"],
-                                                                        "gender": row["gender"],
-                                                                        "all_user": row["all_user"],
-                                                                        "email": row["email"],
-                                                                        "other_info": row["other_info"],
-                                                                        "date_of_birth": row["date_of_birth"],
-                                                                        "bio": row["bio"],
-                                                                        "city_of_residence": row["city_of_residence"]
-                                                                        })
+        result_json = sg.Select_from_table(query=query, variables= profile_variables(row))
         # print("result_json ......", result_json)
         return result_json
     
     def insert_trainee_information(self, sg,  row):
-        query = """mutation createTrainees(
-                    $email: String
-                    $alluser: ID
-                    $traineeID: String
-                    $batch: ID
-                    ) {
-                    createTrainee(
-                        data: {
-                        email: $email
-                        Status: Accepted
-                        all_user: $alluser
-                        trainee_id: $traineeID
-                        batch:$batch
-                        }
-                    ) {
-                        data {
-                        id
-                        }
-                    }
-                    }"""
+        query = CREATE_TRAINEE_MUTATION
         result_json = sg.Select_from_table(query=query, variables= row)
         return result_json
     
-    def read_accepted_trainee(self,sg, trainee_params):
+    def iter_accepted_trainee(self, sg, trainee_params, fields=TRAINEE_FIELDS, **kwargs):
+        """Stream every trainee of a batch with the given status, page by page (only `fields` are selected)"""
         bquery = """
-                query get_trainee ($batch:Int, $status:String){
+                query get_trainee ($batch:Int, $status:String, $start:Int, $limit:Int){
                     trainees(
-                        pagination: { start: 0, limit: 1000 }
+                        pagination: { start: $start, limit: $limit }
+                        sort: "id:asc"
                         filters: { batch: { Batch: { eq: $batch } }, Status: { eq: $status } }
                     ) {
                         meta {
@@ -329,26 +543,17 @@ class CommunicationManager:
                         }
                         }
                         data {
-                        attributes {
-                            email
-                            all_user {
-                            data {
-                                id
-                                attributes {
-                                email
-                                }
-                            }
-                            }
-                        }
+                        __FIELDS__
                         }
                     }
                     }
             """
-        traineeJson = sg.Select_from_table(
-                                            query=bquery, 
-                                            variables={"batch": trainee_params['batch'], 
-                                                           "status": trainee_params['status']})
-        return traineeJson
+        return self.iter_collection(sg, projected(bquery, fields), 'trainees',
+                                    {"batch": trainee_params['batch'],
+                                     "status": trainee_params['status']}, **kwargs)
+
+    def read_accepted_trainee(self,sg, trainee_params, fields=TRAINEE_FIELDS):
+        return collection_response('trainees', self.iter_accepted_trainee(sg, trainee_params, fields))
 
     def update_review_category_with_revewers(self, sg, reviview_category_params):
         query = """mutation updateReviewCategoryReviewers($id:ID!,$reviewers:[ID]){
@@ -364,36 +569,6 @@ class CommunicationManager:
         res = sg.Select_from_table(query = query, variables={'id': reviview_category_params['review_category_id'], 
                                                              'reviewers':reviview_category_params['reviewers']})
         return res
-    def get_user_with_out_alluser( self, sg, role):
-        query = """query getAllTrainees($role:String){
-            usersPermissionsUsers(filters:{
-                all_users:{id:{eq:null}}
-                role:{name:{eq:$role}}}
-            pagination:{start:0,limit:2000}){
-                meta{
-                pagination{
-                    total
-                }
-                }
-                data{
-                id
-                attributes{
-                    email
-                    username
-                    all_users{
-                    data{
-                        attributes{
-                        name
-                        }
-                    }
-                    }
-                }
-                }
-            }
-            }"""
-        result_json = sg.Select_from_table(query=query,variables =  {"role":role})
-        return result_json
-    
     def update_batch_user_for_group(self, sg, groupid : int, all_users_for_group):
         update_query = """mutation updateGroup($groupID:ID!,$allusersID:[ID]){
         updateGroup(id:$groupID,data:{all_users:$allusersID}){
@@ -407,9 +582,10 @@ class CommunicationManager:
         return resu_json
     
     def get_allUser_by_groupId(self, sg, groupId):
-        query = """query getallUserID($groupID:ID){
+        query = """query getallUserID($groupID:ID,$start:Int,$limit:Int){
         allUsers(
-            pagination:{start:0,limit:2000}
+            pagination:{start:$start,limit:$limit}
+            sort:"id:asc"
             filters:{groups:{id:{eq:$groupID}}}){
             meta{
             pagination{
@@ -421,14 +597,14 @@ class CommunicationManager:
             }
         }
         }"""
-        resu_json = sg.Select_from_table(query=query, variables={"groupID":groupId})
-        with_group = [str(i['id']) for i in resu_json['data']['allUsers']['data']]
+        with_group = [str(i['id']) for i in self.iter_collection(sg, query, 'allUsers', {"groupID":groupId})]
         return with_group
     
     def get_all_user_without_group (self, sg):
-        query = """query getallUserID{
+        query = """query getallUserID($start:Int,$limit:Int){
         allUsers(
-            pagination:{start:0,limit:2000}
+            pagination:{start:$start,limit:$limit}
+            sort:"id:asc"
             filters:{groups:{id:{eq:null}}}){
             meta{
             pagination{
@@ -440,109 +616,211 @@ class CommunicationManager:
             }
         }
         }"""
-        result_json = sg.Select_from_table(query=query, variables=None)
-        without_group = [str(i['id']) for i in result_json['data']['allUsers']['data']]
+        without_group = [str(i['id']) for i in self.iter_collection(sg, query, 'allUsers')]
         return without_group
     
-    def get_user_with_out_alluser( self, sg, role):
-        query = """query getAllTrainees($role:String){
+    def iter_user_with_out_alluser(self, sg, role, fields=USER_WITHOUT_ALLUSER_FIELDS, **kwargs):
+        """Stream every users-permissions user of a role that has no allUser (only `fields` are selected)"""
+        query = """query getAllTrainees($role:String,$start:Int,$limit:Int){
                     usersPermissionsUsers(filters:{
                         all_users:{id:{eq:null}}
                         role:{name:{eq:$role}}}
-                    pagination:{start:0,limit:2000}){
+                    sort:"id:asc"
+                    pagination:{start:$start,limit:$limit}){
                         meta{
                         pagination{
                             total
                         }
                         }
                         data{
-                        id
-                        attributes{
-                            email
-                            username
-                            all_users{
-                            data{
-                                attributes{
-                                name
-                                }
-                            }
-                            }
-                        }
+                        __FIELDS__
                         }
                     }
                     }"""
-        result_json = sg.Select_from_table(query=query,variables =  {"role":role})
-        return result_json
+        return self.iter_collection(sg, projected(query, fields), 'usersPermissionsUsers', {"role":role}, **kwargs)
+
+    def get_user_with_out_alluser( self, sg, role, fields=USER_WITHOUT_ALLUSER_FIELDS):
+        return collection_response('usersPermissionsUsers', self.iter_user_with_out_alluser(sg, role, fields))
 
     def delete_user(self, sg, user_id: str):
         """Delete a user by ID"""
-        query = """
-        mutation deleteUser($id: ID!) {
-            deleteUsersPermissionsUser(id: $id) {
-                data {
-                    id
-                }
-            }
-        }
-        """
+        query = DELETE_USER_MUTATION
         variables = {"id": user_id}
         return sg.Select_from_table(query, variables)
 
     def delete_alluser(self, sg, alluser_id: str):
         """Delete an alluser by ID"""
-        query = """
-        mutation deleteAllUser($id: ID!) {
-            deleteAllUser(id: $id) {
-                data {
-                    id
-                }
-            }
-        }
-        """
+        query = DELETE_ALL_USER_MUTATION
         variables = {"id": alluser_id}
         return sg.Select_from_table(query, variables)
 
     def delete_profile(self, sg, profile_id: str):
         """Delete a profile by ID"""
-        query = """
-        mutation deleteProfile($id: ID!) {
-            deleteProfile(id: $id) {
-                data {
-                    id
-                }
-            }
-        }
-        """
+        query = DELETE_PROFILE_MUTATION
         variables = {"id": profile_id}
         return sg.Select_from_table(query, variables)
 
     def delete_trainee(self, sg, trainee_id: str):
         """Delete a trainee by ID"""
-        query = """
-        mutation deleteTrainee($id: ID!) {
-            deleteTrainee(id: $id) {
-                data {
-                    id
-                }
-            }
-        }
-        """
+        query = DELETE_TRAINEE_MUTATION
         variables = {"id": trainee_id}
         return sg.Select_from_table(query, variables)
     
     
+    def iter_collection(self, sg, query, collection, variables=None, page_size=None, concurrency=None):
+        """
+        Yield every record of a paginated collection query.
+
+        The query must take $start:Int and $limit:Int, pass them to
+        pagination:{start:$start, limit:$limit} and select
+        meta.pagination.total. The first page gives the total; the remaining
+        pages are fetched with at most `concurrency` requests in flight and
+        their records are yielded as each page arrives.
+
+        Args:
+            sg: graphql object for interacting with the database
+            query (str): paginated collection query
+            collection (str): collection field in the response, e.g. 'allUsers'
+            variables (dict): query variables other than start/limit
+            page_size (int): records per page, defaults to STRAPI_PAGE_SIZE
+            concurrency (int): pages in flight, defaults to STRAPI_PAGE_CONCURRENCY
+
+        Yields:
+            dict: one collection record ({'id': .., 'attributes': {..}})
+        """
+        settings = get_settings()
+        page_size = page_size or settings.STRAPI_PAGE_SIZE
+        concurrency = concurrency or settings.STRAPI_PAGE_CONCURRENCY
+        variables = dict(variables or {})
+
+        def fetch_page(start):
+            result_json = sg.Select_from_table(query=query,
+                                               variables={**variables, "start": start, "limit": page_size})
+            if not result_json.get('data') or result_json['data'].get(collection) is None:
+                raise Exception("Query for {} failed: {}".format(collection, result_json.get('errors')))
+            return result_json['data'][collection]
+
+        first_page = fetch_page(0)
+        yield from first_page['data']
+
+        total = first_page['meta']['pagination']['total']
+        starts = iter(range(page_size, total, page_size))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = {executor.submit(fetch_page, start) for start in islice(starts, concurrency)}
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()['data']
+                    next_start = next(starts, None)
+                    if next_start is not None:
+                        in_flight.add(executor.submit(fetch_page, next_start))
+
+    def run_aliased_mutations(self, sg, document, variables_list, batch_size=None):
+        """
+        Send many copies of a single mutation as aliased fields of one document.
+
+        Rows are reported per alias: 'ok' with data, 'failed' when Strapi
+        rejected them (safe to resend), or 'unknown' when the request broke
+        off after it was sent, so Strapi may have applied it; resending
+        those rows can create duplicates. A chunk Strapi rejected as a whole
+        (400/409/422) is sent again row by row so one bad row does not fail
+        the others.
+
+        Args:
+            sg: graphql object for interacting with the database
+            document (str): single-mutation document, e.g. CREATE_ALL_USER_MUTATION
+            variables_list (list): variables of each row, in input order
+            batch_size (int): mutations per request, defaults to STRAPI_MUTATION_BATCH_SIZE
+
+        Returns:
+            list: one {'status': 'ok'|'failed'|'unknown', 'data': ..., 'errors': [...]}
+                per input row, in input order
+        """
+        batch_size = batch_size or get_settings().STRAPI_MUTATION_BATCH_SIZE
+        results = []
+        for start in range(0, len(variables_list), batch_size):
+            chunk = variables_list[start:start + batch_size]
+            query = aliased_document(document, len(chunk))
+            variables = {f"a{i}_{key}": value
+                         for i, row_variables in enumerate(chunk)
+                         for key, value in row_variables.items()}
+            try:
+                # per-alias errors come back with the partial data instead of raising
+                result_json = sg.Select_from_table(query=query, variables=variables, raise_errors=False)
+            except (StrapiValidationError, StrapiConflictError) as e:
+                if len(chunk) > 1:
+                    # the document was refused before anything was applied
+                    results.extend(self.run_aliased_mutations(sg, document, chunk, batch_size=1))
+                else:
+                    results.append(_mutation_result('failed', None, [{'message': str(e)}]))
+                continue
+            except StrapiCircuitOpenError as e:
+                results.extend(_mutation_result('failed', None, [{'message': str(e)}]) for _ in chunk)
+                continue
+            except StrapiTransientError as e:
+                results.extend(_mutation_result('unknown', None, [{'message': str(e)}]) for _ in chunk)
+                continue
+            except StrapiError as e:
+                # auth and other 4xx answers: refused, but a smaller chunk would not help
+                results.extend(_mutation_result('failed', None, [{'message': str(e)}]) for _ in chunk)
+                continue
+            except Exception as e:
+                results.extend(_mutation_result('unknown', None, [{'message': str(e)}]) for _ in chunk)
+                continue
+
+            data = result_json.get('data') or {}
+            errors = {}
+            for error in result_json.get('errors') or []:
+                path = error.get('path') or [None]
+                errors.setdefault(path[0], []).append(error)
+
+            for i in range(len(chunk)):
+                alias = f"a{i}"
+                row_data = data.get(alias)
+                row_errors = errors.get(alias, [])
+                if row_data is None and not row_errors:
+                    # errors without a path (e.g. document validation) hit every row
+                    row_errors = errors.get(None, [])
+                status = 'ok' if row_data is not None and not row_errors else 'failed'
+                results.append(_mutation_result(status, row_data, row_errors))
+        return results
+
+    def bulk_insert_all_users(self, sg, all_user_rows, batch_size=None):
+        return self.run_aliased_mutations(sg, CREATE_ALL_USER_MUTATION,
+                                          [all_user_variables(row) for row in all_user_rows], batch_size)
+
+    def bulk_insert_profile_information(self, sg, rows, batch_size=None):
+        return self.run_aliased_mutations(sg, CREATE_PROFILE_INFORMATION_MUTATION,
+                                          [profile_variables(row) for row in rows], batch_size)
+
+    def bulk_create_reviewer(self, sg, reviewer_rows, batch_size=None):
+        results = self.run_aliased_mutations(sg, CREATE_REVIEWER_MUTATION,
+                                             [reviewer_variables(row) for row in reviewer_rows], batch_size)
+        self.invalidate_cache(sg, 'reviewers')
+        return results
+
+    def bulk_create_user_preference(self, sg, user_preference_rows, batch_size=None):
+        return self.run_aliased_mutations(sg, CREATE_PREFERENCE_MUTATION,
+                                          [preference_variables(row) for row in user_preference_rows], batch_size)
+
+    def bulk_delete_user(self, sg, user_ids, batch_size=None):
+        return self.run_aliased_mutations(sg, DELETE_USER_MUTATION,
+                                          [{"id": i} for i in user_ids], batch_size)
+
+    def bulk_delete_alluser(self, sg, alluser_ids, batch_size=None):
+        return self.run_aliased_mutations(sg, DELETE_ALL_USER_MUTATION,
+                                          [{"id": i} for i in alluser_ids], batch_size)
+
+    def bulk_delete_profile(self, sg, profile_ids, batch_size=None):
+        return self.run_aliased_mutations(sg, DELETE_PROFILE_MUTATION,
+                                          [{"id": i} for i in profile_ids], batch_size)
+
+    def bulk_delete_trainee(self, sg, trainee_ids, batch_size=None):
+        return self.run_aliased_mutations(sg, DELETE_TRAINEE_MUTATION,
+                                          [{"id": i} for i in trainee_ids], batch_size)
+    
+    
     def request_auth_query(self):
-        auth_query = """
-                    query {
-                        me {
-                        id
-                username
-                email
-                role {
-                name
-                }
-            }
-            }
-            """
+        auth_query = AUTH_ME_QUERY
         return auth_query
 
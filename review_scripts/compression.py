@@ -0,0 +1,77 @@
+import gzip
+import threading
+from urllib.parse import urlsplit
+
+from api.core.config import get_settings
+from review_scripts import strapi_metrics
+
+try:
+    import brotli
+except ImportError:  # br is optional, gzip is always available
+    brotli = None
+
+# hosts that answered 415 to a compressed body, they get plain bodies from now on
+_rejected_hosts = set()
+_hosts_lock = threading.Lock()
+
+
+def _host(url):
+    return urlsplit(url).netloc
+
+
+def request_encoding():
+    """Configured request Content-Encoding ('br' needs the brotli package)"""
+    encoding = get_settings().STRAPI_REQUEST_ENCODING
+    if encoding == 'br' and brotli is None:
+        return 'gzip'
+    return encoding
+
+
+def compress_body(url, body):
+    """
+    Compress a request body for Strapi when it is worth it.
+
+    Args:
+        url (str): request url, used to skip hosts that rejected compression
+        body (bytes): encoded json body
+
+    Returns:
+        tuple: (body, encoding) where encoding is None when the body is sent as is
+    """
+    settings = get_settings()
+    encoding = request_encoding()
+    if not encoding or not isinstance(body, bytes) or len(body) < settings.STRAPI_COMPRESS_MIN_BYTES \
+            or _host(url) in _rejected_hosts:
+        return body, None
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=5)
+    if len(compressed) >= len(body):
+        return body, None
+    return compressed, encoding
+
+
+def record_request(body, compressed):
+    """Count bytes saved by a compressed request body the server accepted"""
+    strapi_metrics.incr('request_bytes', len(body))
+    strapi_metrics.incr('request_bytes_saved', len(body) - len(compressed))
+
+
+def reject_compression(url):
+    """Remember that a host does not accept compressed request bodies"""
+    with _hosts_lock:
+        _rejected_hosts.add(_host(url))
+
+
+def accept_encoding():
+    """Accept-Encoding advertised to Strapi for responses"""
+    return "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+
+
+def record_response(response, wire_bytes):
+    """Count bytes saved by a compressed response (decoded size - wire size)"""
+    if wire_bytes and response.headers.get('Content-Encoding'):
+        strapi_metrics.incr('response_bytes', len(response.content))
+        strapi_metrics.incr('response_bytes_saved', len(response.content) - wire_bytes)
@@ -10,7 +10,7 @@ import uuid
 from review_scripts.strapi_graphql import StrapiGraphql
 from review_scripts.strapi_methods import StrapiMethods
 from utils.question_mapper import column_mapper
-from review_scripts.communication_manager import CommunicationManager
+from review_scripts.communication_manager import CommunicationManager, ROSTER_FIELDS
 from utils.gdrive import gsheet
 
 class InsertAllUsers:
@@ -191,12 +191,12 @@ class InsertAllUsers:
       
         batch = int(self.batch.split("-")[1])
         req_params = {"batch":batch, "role":self.role}
-        result_json = self.cm.read_all_users(self.sg, req_params)
+        result_json = self.cm.read_all_users(self.sg, req_params, fields=ROSTER_FIELDS)
         df = pd.json_normalize(result_json['data']['allUsers']['data'])
         df.rename(columns={"attributes.name": "name", "attributes.email": "Email",
                     "attributes.Batch": "batches", 'id':'all_user'}, inplace=True)
        
-        df = df.drop(columns=['name'])
+        df = df.drop(columns=['name'], errors='ignore')
         return df
 
 
@@ -217,8 +217,8 @@ class InsertAllUsers:
         df['batches']= batch
 
 
-        for i, row in df.iterrows():
-            res = self.cm.create_reviewer(self.sg, row)
+        results = self.cm.bulk_create_reviewer(self.sg, df.to_dict('records'))
+        for res in results:
             print(res)
         # table = f"https://{self.root}.10academy.org/api/reviewers"
         # result = df.to_json(orient="records", date_format='iso')
@@ -395,21 +395,8 @@ class InsertAllUsers:
             Returns:
                 reviewers (list): List of reviewers for current batch
             """
-            query = """ query getReviewer($batch: Int) {
-                    reviewers(
-                        pagination: { start: 0, limit: 100 }
-                        filters: { batches: { Batch: { eq: $batch } } }
-                    ) {
-                        data {
-                        id
-                        attributes {
-                            Email
-                        }
-                        }
-                    }
-                    }
-            """
-            reviewerJson = self.sg.Select_from_table(query=query, variables={"batch": self.batch})
+            # cached (and paginated) by CommunicationManager, so calling it per chunk is cheap
+            reviewerJson = self.cm.read_batch_specific_reviewers(self.sg, self.batch, fields=('id',))
             
             reviewerdf =  pd.json_normalize(reviewerJson['data']['reviewers']['data'])
             reviewers = reviewerdf['id'].to_list()
@@ -796,11 +783,11 @@ class InsertAllUsers:
         print("INFO:Total number of newly accepted with trainee ",adf.shape)
         result = adf.to_json(orient="records", date_format = 'iso')
         
-        url = f"https://{self.root}.10academy.org/api/trainees"
+        # url = f"https://{self.root}.10academy.org/api/trainees"
+        url = "trainees"
 
-        for single in json.loads(result):
-            print(single)
-            r= self.sm.insert_data(single,url,self.sm.token['token'])
+        results = self.sm.insert_many(url, json.loads(result))
+        for r in results:
             print(r)
 
         print("All records have been inserted successfully")
@@ -70,7 +70,7 @@ class InsertInterview:
     
  
     def get_reviewers(self):
-        review_json = self.cm.read_batch_specific_reviewers(self.sg, self.batch)
+        review_json = self.cm.read_batch_specific_reviewers(self.sg, self.batch, fields=('id',))
 
         reviewerdf = pd.json_normalize(review_json['data']['reviewers']['data'])
     
@@ -80,6 +80,7 @@ class InsertInterview:
  
     def insert_review(self,  df, reviewers):
         table = "reviews"
+        records = []
         for i, row in df.iterrows():
 
             tosend =  {
@@ -90,7 +91,9 @@ class InsertInterview:
                     "reviewers": reviewers
 
             }
-            review_result = self.sm.insert_data(tosend,table)
+            records.append(tosend)
+
+        for review_result in self.sm.insert_many(table, records):
             print(review_result)
     
     def insert_interview(self):
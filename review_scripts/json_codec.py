@@ -0,0 +1,50 @@
+import datetime
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is the fallback
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def _default(obj):
+    """Types that show up in dataframe rows but are not json serialisable"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    CODEC = 'orjson'
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        """Serialise to compact json bytes"""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def loads(data):
+        """Parse json from bytes or str"""
+        return orjson.loads(data)
+else:
+    CODEC = 'json'
+
+    def dumps(obj):
+        """Serialise to compact json bytes"""
+        return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+    def loads(data):
+        """Parse json from bytes or str"""
+        return json.loads(data)
+
+
+def decode_response(response):
+    """Body of a requests / httpx response parsed with the active codec"""
+    return loads(response.content)
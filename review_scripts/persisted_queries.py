@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from functools import lru_cache
+
+# characters around which whitespace carries no meaning in a graphql document
+PUNCTUATORS = set('!$&().:=@[]{}|')
+
+APQ_NOT_FOUND = ('PERSISTED_QUERY_NOT_FOUND', 'PersistedQueryNotFound')
+APQ_NOT_SUPPORTED = ('PERSISTED_QUERY_NOT_SUPPORTED', 'PersistedQueryNotSupported')
+# what a graphql server without persisted query support answers to a hash-only request
+NO_QUERY_MESSAGES = ('must provide query string', 'graphql operations must contain a non-empty `query`')
+
+
+def minify(document):
+    """
+    Strip comments and insignificant whitespace from a graphql document.
+
+    String literals (including block strings) are copied unchanged; any run of
+    whitespace is dropped next to a punctuator and collapsed to one space
+    between two names.
+    """
+    out = []
+    i, n = 0, len(document)
+    pending_space = False
+    while i < n:
+        c = document[i]
+        if c == '#':
+            while i < n and document[i] not in '\r\n':
+                i += 1
+            pending_space = True
+            continue
+        if c in ' \t\r\n,':
+            # commas are insignificant in graphql, they count as whitespace
+            pending_space = True
+            i += 1
+            continue
+        if c == '"':
+            quote = '"""' if document.startswith('"""', i) else '"'
+            end = i + len(quote)
+            while end < n and not document.startswith(quote, end):
+                end += 2 if document[end] == '\\' else 1
+            end = min(n, end + len(quote))
+            token = document[i:end]
+        else:
+            token = c
+            end = i + 1
+        if pending_space and out and out[-1][-1] not in PUNCTUATORS and token[0] not in PUNCTUATORS:
+            out.append(' ')
+        pending_space = False
+        out.append(token)
+        i = end
+    return ''.join(out)
+
+
+class PersistedQuery:
+    """A minified document and its sha256, as used by automatic persisted queries"""
+    def __init__(self, document):
+        self.text = minify(document)
+        self.sha256 = hashlib.sha256(self.text.encode('utf-8')).hexdigest()
+
+    @property
+    def extensions(self):
+        return {'persistedQuery': {'version': 1, 'sha256Hash': self.sha256}}
+
+
+@lru_cache(maxsize=512)
+def persisted(document):
+    """Registry lookup: the PersistedQuery of a document, minified and hashed once"""
+    return PersistedQuery(document)
+
+
+def register(*documents):
+    """Minify and hash documents ahead of time (at import of the module using them)"""
+    for document in documents:
+        persisted(document)
+
+
+_unsupported_hosts = set()
+_hosts_lock = threading.Lock()
+
+
+def supports_apq(host):
+    return host not in _unsupported_hosts
+
+
+def mark_unsupported(host):
+    """Remember that a server rejected hash-only requests, so it gets full text from now on"""
+    with _hosts_lock:
+        _unsupported_hosts.add(host)
+
+
+def apq_status(body):
+    """
+    'not_found' / 'not_supported' when a hash-only request was refused,
+    None when the server executed it.
+    """
+    errors = body.get('errors') if isinstance(body, dict) else None
+    for error in errors or []:
+        code = (error.get('extensions') or {}).get('code')
+        message = error.get('message')
+        if code in APQ_NOT_FOUND or message in APQ_NOT_FOUND:
+            return 'not_found'
+        if code in APQ_NOT_SUPPORTED or message in APQ_NOT_SUPPORTED:
+            return 'not_supported'
+        if message and message.lower().startswith(NO_QUERY_MESSAGES):
+            return 'not_supported'
+    return None
+
+
+def next_apq_step(host, status_code, body):
+    """
+    Decide what follows a hash-only request.
+
+    Returns:
+        str: 'done' when the server executed it, 'register' when it does not
+        know the hash yet (resend text + hash), 'fallback' when the server does
+        not support persisted queries (resend text only, and remember the host)
+        or refused the request for another reason (resend text only, this time;
+        a 400 for bad variables must not turn persisted queries off)
+    """
+    status = apq_status(body)
+    if status_code == 200 and status is None:
+        return 'done'
+    if status == 'not_found':
+        return 'register'
+    if status == 'not_supported':
+        mark_unsupported(host)
+    return 'fallback'
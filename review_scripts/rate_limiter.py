@@ -0,0 +1,127 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+
+# statuses Strapi (or the proxy in front of it) uses to ask us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+
+    Returns:
+        float|None: delay in seconds, None when the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every Strapi client of a stage.
+
+    Callers reserve a token and sleep for the returned delay, so the same
+    bucket serves threads (acquire) and coroutines (acquire_async). The rate
+    adapts: it starts at `rate`, is halved whenever Strapi throttles us and
+    climbs by 5% of the starting rate on every accepted request, up to
+    `max_rate` (the starting rate when not given).
+    """
+    def __init__(self, rate, burst, min_rate=1.0, max_rate=None):
+        self.max_rate = max(float(max_rate or rate), float(rate))
+        self.min_rate = min(float(min_rate), float(rate))
+        self.rate = float(rate)
+        self.step = float(rate) * 0.05
+        self.capacity = float(burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller has to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_throttled(self, delay):
+        """Pause every caller for `delay` seconds and halve the rate"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def on_success(self):
+        """Additive increase towards max_rate"""
+        if self.rate < self.max_rate:
+            with self._lock:
+                self.rate = min(self.max_rate, self.rate + self.step)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(run_stage=None, pool='default'):
+    """
+    Process-wide TokenBucket for the Strapi root of a run_stage.
+
+    `pool='auth'` is the separate bucket of the callers' `me` checks, so a
+    batch filling the default bucket does not hold up logins.
+    """
+    root, _ = get_strapi_params(run_stage or strapi_stage)
+    key = (root, pool)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                settings = get_settings()
+                limiter = TokenBucket(settings.STRAPI_RATE_LIMIT, settings.STRAPI_RATE_BURST,
+                                      max_rate=settings.STRAPI_RATE_CEILING)
+                _limiters[key] = limiter
+    return limiter
+
+
+def throttle_delay(response_headers, attempt):
+    """Delay before retrying a throttled call: Retry-After, else exponential backoff"""
+    delay = parse_retry_after(response_headers.get('Retry-After'))
+    if delay is None:
+        delay = get_settings().STRAPI_THROTTLE_BACKOFF * (2 ** attempt)
+    return delay
+
+
+def retry_backoff(attempt):
+    """Full-jitter exponential backoff before retrying a transient failure"""
+    settings = get_settings()
+    cap = min(settings.STRAPI_RETRY_MAX_BACKOFF, settings.STRAPI_RETRY_BACKOFF * (2 ** attempt))
+    return random.uniform(0, cap)
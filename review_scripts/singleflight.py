@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+
+
+def flight_key(*parts):
+    """Hashable key for a call, variables are serialised with sorted keys"""
+    return tuple(json.dumps(p, sort_keys=True, default=str) if isinstance(p, (dict, list)) else p
+                 for p in parts)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls from threads.
+
+    The first caller of a key runs `fn`; callers arriving while it is in
+    flight wait and get the same result (or exception). Results are shared,
+    so callers must treat them as read-only.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce identical concurrent coroutine calls on the running event loop.
+
+    Followers wait on the leader's future through asyncio.shield, so a
+    cancelled follower does not cancel the shared call; if the leader itself
+    is cancelled the followers start a new flight.
+    """
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, coro_fn):
+        loop = asyncio.get_running_loop()
+        key = (loop, key)
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = self._calls[key] = loop.create_future()
+        # avoid "exception was never retrieved" when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+# process-wide instances used by the Strapi clients
+_singleflight = SingleFlight()
+_async_singleflight = AsyncSingleFlight()
+
+
+def get_singleflight():
+    return _singleflight
+
+
+def get_async_singleflight():
+    return _async_singleflight
@@ -8,7 +8,7 @@ if not cpath in sys.path:
     sys.path.append(cpath)
 
 #  
-from review_scripts.communication_manager import CommunicationManager
+from review_scripts.communication_manager import CommunicationManager, ROSTER_FIELDS
 
 from review_scripts.strapi_graphql import StrapiGraphql
 from utils.gdrive import gsheet
@@ -150,12 +150,12 @@ class StaffInformationProcessor:
       
         batch = int(self.configs.batch)
         req_params = {"batch":batch, "role":self.configs.role}
-        result_json = self.cm.read_all_users(self.sg, req_params)
+        result_json = self.cm.read_all_users(self.sg, req_params, fields=ROSTER_FIELDS)
         df = pd.json_normalize(result_json['data']['allUsers']['data'])
         df.rename(columns={"attributes.name": "name", "attributes.email": "Email",
                     "attributes.Batch": "batches", 'id':'all_user'}, inplace=True)
        
-        df = df.drop(columns=['name'])
+        df = df.drop(columns=['name'], errors='ignore')
         return df
     def insert_reviewers(self):
         """
@@ -174,14 +174,14 @@ class StaffInformationProcessor:
         df['batches']= batch
       
 
-        for i, row in df.iterrows():
-            res = self.cm.create_reviewer(self.sg, row)
+        results = self.cm.bulk_create_reviewer(self.sg, df.to_dict('records'))
+        for res in results:
             print(res)
         print("All records are inserted")
 
     def create_group_for_staff(self):
         "!!!!!!! Don't run as it is check for the default value"
-        res = self.cm.read_batch_specific_reviewers(self.sg, self.configs.batch)
+        res = self.cm.read_batch_specific_reviewers(self.sg, self.configs.batch, fields=('id',))
         batch_specific_staff_id =  []
         for i in res['data']['reviewers']['data']:
             batch_specific_staff_id.append(i['id'])
@@ -207,7 +207,9 @@ class StaffInformationProcessor:
         return user_info
     def insert_user_preference (self):
         res_json =  self.cm.read_all_users(self.sg, {"batch":self.configs.batch, 
-                                                     "role":self.configs.role})
+                                                     "role":self.configs.role},
+                                           fields=('attributes.user.data.id',
+                                                   'attributes.user.data.attributes.email'))
         user_details = self.extract_user_info(res_json['data']['allUsers']['data'])
         staff_df = self.get_staff_data()
         staff_df.rename(columns={'Full Name': 'name', 'Email': 'user_email'}, inplace=True)
@@ -217,12 +219,10 @@ class StaffInformationProcessor:
         default_setting =  {"batch": self.configs.batch ,"batchID":self.get_batch_id() }
      
 
-        for i, row in all_df.iterrows():
-            
-            variables= {"main_user_id":row['user_id'],
+        preferences = [{"main_user_id":row['user_id'],
                         "email": row['user_email'],
-                        "defaultSettings":default_setting}
-            res = self.cm.create_user_preference(self.sg, variables)
+                        "defaultSettings":default_setting} for i, row in all_df.iterrows()]
+        for res in self.cm.bulk_create_user_preference(self.sg, preferences):
             print (res)
        
 
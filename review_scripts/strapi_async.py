@@ -0,0 +1,304 @@
+import asyncio
+import os, sys
+import httpx
+
+curdir = os.path.dirname(os.path.realpath(__file__))
+cpath = os.path.dirname(curdir)
+if not cpath in sys.path:
+    sys.path.append(cpath)
+
+from utils.secret import get_auth, lambda_friendly_path
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+from review_scripts.rate_limiter import THROTTLE_STATUSES, get_rate_limiter, retry_backoff, throttle_delay
+from review_scripts.circuit_breaker import get_circuit_breaker
+from review_scripts.strapi_errors import (
+    StrapiTransientError,
+    error_for_graphql,
+    error_for_status,
+    is_read_document,
+    response_details,
+)
+from review_scripts.strapi_session import IDEMPOTENT_METHODS, RETRY_STATUSES
+from review_scripts.persisted_queries import persisted, supports_apq, next_apq_step
+from review_scripts.json_codec import JSON_CONTENT_TYPE, decode_response, dumps
+from review_scripts.singleflight import flight_key, get_async_singleflight
+from review_scripts.compression import accept_encoding, compress_body, record_request, record_response, reject_compression
+from review_scripts.communication_manager import (
+    CREATE_USER_MUTATION,
+    CREATE_ALL_USER_MUTATION,
+    CREATE_PROFILE_INFORMATION_MUTATION,
+    CREATE_TRAINEE_MUTATION,
+    DELETE_USER_MUTATION,
+    DELETE_ALL_USER_MUTATION,
+    DELETE_PROFILE_MUTATION,
+    DELETE_TRAINEE_MUTATION,
+    user_variables,
+    all_user_variables,
+    profile_variables,
+)
+
+# one pooled httpx.AsyncClient per Strapi root and event loop
+_clients = {}
+
+
+def get_async_http_client(run_stage=None):
+    """
+    Return the shared httpx.AsyncClient for a run_stage.
+
+    httpx clients are bound to the event loop they were first used on, so a
+    new client is created when the running loop changes (e.g. scripts calling
+    asyncio.run more than once).
+    """
+    root, _ = get_strapi_params(run_stage or strapi_stage)
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(root)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.STRAPI_READ_TIMEOUT,
+                                  connect=settings.STRAPI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=settings.STRAPI_POOL_MAXSIZE,
+                                max_keepalive_connections=settings.STRAPI_POOL_MAXSIZE),
+            headers={"Accept-Encoding": accept_encoding()},
+        )
+        _clients[root] = (loop, client)
+        return client
+    return entry[1]
+
+
+async def close_async_http_clients():
+    """Close every shared httpx.AsyncClient (used on shutdown)"""
+    entries = list(_clients.values())
+    _clients.clear()
+    for _, client in entries:
+        if not client.is_closed:
+            await client.aclose()
+
+
+class AsyncStrapiClient:
+    """
+    Non-blocking Strapi client for async callers.
+
+    Mirrors the CommunicationManager operations used by the API so the
+    FastAPI layer can await Strapi I/O instead of blocking the event loop
+    with the requests based StrapiGraphql / StrapiMethods.
+    """
+    # rate limiter and circuit breaker pool shared with the other clients of the stage
+    pool = 'default'
+
+    def __init__(self, **kwargs):
+
+        run_stage = kwargs.get('run_stage') or strapi_stage
+        self.run_stage = run_stage
+        root, ssmkey = get_strapi_params(run_stage)
+
+        if run_stage.lower().startswith('tenacious'):
+            self.restroot = "https://cms.gettenacious.com"
+        else:
+            self.restroot = f"https://{root}.10academy.org"
+        self.apiroot = f"{self.restroot}/graphql"
+
+        self.ssmkey = ssmkey
+        # read per call like the sync clients' token, so refreshed tokens are used
+        self._token_source = dict(ssmkey=ssmkey, envvar='STRAPI_TOKEN',
+                                  fconfig=lambda_friendly_path(f'.env/{root}.json'))
+        self.token
+        self.limiter = get_rate_limiter(run_stage, self.pool)
+        self.breaker = get_circuit_breaker(run_stage, self.pool)
+
+    @property
+    def token(self):
+        """Current Strapi token from get_auth's cache"""
+        return get_auth(**self._token_source)
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}", "Content-Type": JSON_CONTENT_TYPE}
+
+    @property
+    def client(self):
+        return get_async_http_client(self.run_stage)
+
+    async def _send(self, method, url, timeout=None, idempotent=None, **kwargs):
+        """
+        Send a request through the shared client with the same rate limit,
+        retry and circuit breaker rules as strapi_session.send_request
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = get_settings().STRAPI_RETRY_ATTEMPTS
+        probe = self.breaker.before_call()
+        try:
+            for attempt in range(attempts + 1):
+                try:
+                    response = await self._send_compressed(method, url, timeout, **kwargs)
+                except httpx.TransportError as e:
+                    error = StrapiTransientError(f"Request to {url} failed: {e}")
+                    retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                else:
+                    if response.status_code < 500:
+                        self.breaker.record_success()
+                        return response
+                    error = None
+                    retryable = idempotent and response.status_code in RETRY_STATUSES
+
+                if not retryable or attempt == attempts or self.breaker.is_open:
+                    break
+                await asyncio.sleep(retry_backoff(attempt))
+        except BaseException:
+            # cancelled (client gone, batch aborted) or a local error: says nothing about Strapi
+            if probe:
+                self.breaker.release_probe()
+            raise
+
+        self.breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    async def _send_compressed(self, method, url, timeout=None, **kwargs):
+        """One call with a compressed body when large enough, plain again after a 415"""
+        compressed, encoding = compress_body(url, kwargs.get('content'))
+        if encoding is None:
+            response = await self._send_throttled(method, url, timeout, **kwargs)
+        else:
+            headers = {**(kwargs.get('headers') or {}), 'Content-Encoding': encoding}
+            response = await self._send_throttled(method, url, timeout,
+                                                  **{**kwargs, 'content': compressed, 'headers': headers})
+            if response.status_code == 415:
+                reject_compression(url)
+                response = await self._send_throttled(method, url, timeout, **kwargs)
+            else:
+                record_request(kwargs['content'], compressed)
+
+        record_response(response, response.num_bytes_downloaded
+                        or int(response.headers.get('Content-Length') or 0))
+        return response
+
+    async def _send_throttled(self, method, url, timeout=None, **kwargs):
+        """One call, repeated while Strapi answers 429/503"""
+        if timeout:
+            kwargs['timeout'] = timeout
+        retries = get_settings().STRAPI_THROTTLE_RETRIES
+        for attempt in range(retries + 1):
+            await self.limiter.acquire_async()
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code not in THROTTLE_STATUSES or attempt == retries:
+                break
+            self.limiter.on_throttled(throttle_delay(response.headers, attempt))
+
+        if response.status_code not in THROTTLE_STATUSES:
+            self.limiter.on_success()
+        return response
+
+    async def execute(self, query, variables=None, timeout=None, token=None):
+        """
+        Run a graphql query or mutation
+
+        Identical queries (same document, variables and token) issued
+        concurrently share one call and one decoded result.
+
+        Args:
+            query (String): graphql document
+            variables (dict): document variables
+            timeout (float): optional per-call timeout
+            token (str): bearer token to use instead of the stage token,
+                e.g. to run the `me` query for a caller
+
+        Raises:
+            StrapiError: typed error for a failed call or a graphql `errors` answer
+
+        Returns:
+            dict: decoded graphql response
+        """
+        document = persisted(query)
+        headers = self.headers
+        if token is not None:
+            headers = {**self.headers, "Authorization": f"Bearer {token}"}
+        if is_read_document(document.text):
+            key = flight_key(self.apiroot, token or self.token, document.sha256, variables)
+            return await get_async_singleflight().do(
+                key, lambda: self._execute(document, variables, timeout, headers, True))
+        return await self._execute(document, variables, timeout, headers, False)
+
+    async def _execute(self, document, variables, timeout, headers, idempotent):
+        query = document.text
+        payload = {}
+        if variables is not None:
+            payload['variables'] = variables
+
+        if get_settings().STRAPI_PERSISTED_QUERIES and supports_apq(self.apiroot):
+            response = await self._send('POST', self.apiroot,
+                                        content=dumps({**payload, 'extensions': document.extensions}),
+                                        headers=headers, timeout=timeout, idempotent=idempotent)
+            # server errors and auth failures would repeat with the full text
+            if response.status_code >= 500 or response.status_code in (401, 403):
+                raise error_for_status(response.status_code, response_details(response), query)
+            step = next_apq_step(self.apiroot, response.status_code, response_details(response))
+            if step == 'done':
+                return self._result(decode_response(response), query)
+            if step == 'register':
+                payload['extensions'] = document.extensions
+
+        payload['query'] = document.text
+        response = await self._send('POST', self.apiroot, content=dumps(payload),
+                                    headers=headers, timeout=timeout, idempotent=idempotent)
+        if response.status_code != 200:
+            raise error_for_status(response.status_code, response_details(response), query)
+        return self._result(decode_response(response), query)
+
+    def _result(self, result, query):
+        """Raise the typed error of a graphql answer carrying `errors`"""
+        if result.get('errors'):
+            raise error_for_graphql(result['errors'], query)
+        return result
+
+    async def insert_data(self, data, table, timeout=None):
+        """Insert a record through the Strapi REST api (StrapiMethods.insert_data)"""
+        response = await self._send('POST', f"{self.restroot}/api/{table}",
+                                    content=dumps({"data": data}),
+                                    headers=self.headers, timeout=timeout)
+        if response.status_code >= 300:
+            raise error_for_status(response.status_code, response_details(response), table)
+        return decode_response(response)
+
+    async def register_user(self, user_var, timeout=None):
+        """Register an unconfirmed user through /api/auth/local/register"""
+        return await self._send('POST', f"{self.restroot}/api/auth/local/register",
+                                content=dumps(user_var),
+                                headers=self.headers,
+                                timeout=timeout)
+
+    async def create_user(self, user_data):
+        return await self.execute(CREATE_USER_MUTATION, user_variables(user_data))
+
+    async def insert_all_users(self, all_user_data):
+        return await self.execute(CREATE_ALL_USER_MUTATION, all_user_variables(all_user_data))
+
+    async def insert_profile_information(self, row):
+        return await self.execute(CREATE_PROFILE_INFORMATION_MUTATION, profile_variables(row))
+
+    async def insert_trainee_information(self, row):
+        return await self.execute(CREATE_TRAINEE_MUTATION, row)
+
+    async def delete_user(self, user_id):
+        return await self.execute(DELETE_USER_MUTATION, {"id": user_id})
+
+    async def delete_alluser(self, alluser_id):
+        return await self.execute(DELETE_ALL_USER_MUTATION, {"id": alluser_id})
+
+    async def delete_profile(self, profile_id):
+        return await self.execute(DELETE_PROFILE_MUTATION, {"id": profile_id})
+
+    async def delete_trainee(self, trainee_id):
+        return await self.execute(DELETE_TRAINEE_MUTATION, {"id": trainee_id})
+
+
+class AsyncStrapiAuthClient(AsyncStrapiClient):
+    """
+    AsyncStrapiClient for the `me` checks of API callers.
+
+    Runs on its own rate limiter and circuit breaker, so logins are neither
+    queued behind a bulk import nor rejected while the data breaker is open.
+    """
+    pool = 'auth'
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from api.core.config import get_settings
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache whose entries expire after `ttl` seconds.
+
+    Keys are tuples whose first item is a namespace ('batch', 'reviewers', ...)
+    so a whole family of lookups can be invalidated at once. Hits and misses
+    are counted per namespace.
+    """
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, namespace, field):
+        stats = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+        stats[field] += 1
+
+    def get(self, key):
+        """Return (found, value) for a key, dropping it when expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._count(key[0], 'hits')
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self._count(key[0], 'misses')
+            return False, None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                # evict the entry closest to expiry
+                del self._data[min(self._data, key=lambda k: self._data[k][0])]
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+
+    def get_or_load(self, key, loader, ttl=None, cacheable=None):
+        """
+        Read-through lookup: return the cached value or call `loader()` and
+        cache what it returns (unless `cacheable(value)` is False).
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, namespace=None, *key):
+        """
+        Drop entries of a namespace (optionally only those starting with `key`),
+        or everything when no namespace is given.
+        """
+        prefix = (namespace, *key)
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+                return
+            for k in [k for k in self._data if k[:len(prefix)] == prefix]:
+                del self._data[k]
+
+    def stats(self):
+        """Hit / miss counters and current size per namespace"""
+        with self._lock:
+            sizes = {}
+            for k in self._data:
+                sizes[k[0]] = sizes.get(k[0], 0) + 1
+            return {ns: {**counts, 'size': sizes.get(ns, 0)}
+                    for ns, counts in self._stats.items()}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_strapi_cache():
+    """Process-wide TTLCache for rarely changing Strapi lookups"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_settings()
+                _cache = TTLCache(settings.STRAPI_CACHE_TTL, settings.STRAPI_CACHE_MAXSIZE)
+    return _cache
@@ -0,0 +1,64 @@
+import threading
+
+from api.core.config import strapi_stage
+from review_scripts.strapi_graphql import StrapiGraphql
+from review_scripts.strapi_methods import StrapiMethods
+from review_scripts.strapi_async import AsyncStrapiAuthClient, AsyncStrapiClient
+
+# (client class name, run_stage) -> client instance
+_clients = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _get_client(client_cls, run_stage):
+    """
+    Return the cached client of `client_cls` for a run_stage, building it once.
+
+    Construction first resolves the Strapi token (file, env or Secrets
+    Manager), so it happens at most once per stage and process; afterwards
+    clients read the token from get_auth's cache on each call and pick up
+    its background refreshes. Each key has its own lock so a slow secret
+    lookup for one stage does not block the others.
+    """
+    run_stage = run_stage or strapi_stage
+    key = (client_cls.__name__, run_stage.lower())
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        client = _clients.get(key)
+        if client is None:
+            client = client_cls(run_stage=run_stage)
+            _clients[key] = client
+    return client
+
+
+def get_strapi_graphql(run_stage=None):
+    """Shared StrapiGraphql for a run_stage"""
+    return _get_client(StrapiGraphql, run_stage)
+
+
+def get_strapi_methods(run_stage=None):
+    """Shared StrapiMethods for a run_stage"""
+    return _get_client(StrapiMethods, run_stage)
+
+
+def get_async_strapi_client(run_stage=None):
+    """Shared AsyncStrapiClient for a run_stage"""
+    return _get_client(AsyncStrapiClient, run_stage)
+
+
+def get_async_auth_client(run_stage=None):
+    """Shared AsyncStrapiAuthClient for a run_stage, used to validate caller tokens"""
+    return _get_client(AsyncStrapiAuthClient, run_stage)
+
+
+def reset_strapi_clients():
+    """Drop every cached client (tests, or a changed stage configuration)"""
+    with _registry_lock:
+        _clients.clear()
+        _locks.clear()
@@ -0,0 +1,97 @@
+import re
+
+from review_scripts.json_codec import decode_response
+
+
+class StrapiError(Exception):
+    """
+    Base class for failed Strapi calls.
+
+    Args:
+        message (str): human readable reason
+        status_code (int): HTTP status of the failed call, None for network errors
+        details: decoded error body or graphql `errors` list
+    """
+    def __init__(self, message, status_code=None, details=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+class StrapiTransientError(StrapiError):
+    """Network failure, timeout or 5xx: the same call may succeed later"""
+
+
+class StrapiConflictError(StrapiError):
+    """The record already exists (unique email / username / attribute)"""
+
+
+class StrapiValidationError(StrapiError):
+    """Strapi rejected the payload or the document, retrying will not help"""
+
+
+class StrapiCircuitOpenError(StrapiTransientError):
+    """The stage circuit breaker is open, the call was not sent"""
+
+
+# Strapi reports unique violations with these messages on 400 / graphql errors
+CONFLICT_PATTERN = re.compile(r"already taken|must be unique|already exists|duplicate", re.IGNORECASE)
+TRANSIENT_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+def _messages(details):
+    """Flatten the messages of a Strapi error body or graphql errors list"""
+    if isinstance(details, list):
+        return " ".join(_messages(item) for item in details)
+    if isinstance(details, dict):
+        parts = [str(details.get('message', ''))]
+        for key in ('error', 'extensions', 'details', 'errors'):
+            if key in details:
+                parts.append(_messages(details[key]))
+        return " ".join(p for p in parts if p)
+    return str(details or '')
+
+
+def error_for_status(status_code, details=None, context=''):
+    """
+    Map a non-success HTTP answer to a typed StrapiError.
+
+    Args:
+        status_code (int): HTTP status
+        details: decoded body (dict/list) or raw text
+        context (str): query or url added to the message
+
+    Returns:
+        StrapiError
+    """
+    message = "Query failed to run by returning code of {}. {}".format(status_code, context)
+    if status_code in TRANSIENT_STATUSES:
+        return StrapiTransientError(message, status_code, details)
+    if status_code == 409 or CONFLICT_PATTERN.search(_messages(details)):
+        return StrapiConflictError(message, status_code, details)
+    if status_code in (400, 422):
+        return StrapiValidationError(message, status_code, details)
+    return StrapiError(message, status_code, details)
+
+
+def error_for_graphql(errors, context=''):
+    """Typed error for the `errors` list of a graphql answer delivered with 200"""
+    text = _messages(errors)
+    message = "Query returned errors: {}. {}".format(text, context)
+    if CONFLICT_PATTERN.search(text):
+        return StrapiConflictError(message, 200, errors)
+    return StrapiValidationError(message, 200, errors)
+
+
+def response_details(response):
+    """Decoded error body of a requests / httpx response, raw text if not json"""
+    try:
+        return decode_response(response)
+    except ValueError:
+        return response.text
+
+
+def is_read_document(query):
+    """True for graphql queries (idempotent), False for mutations"""
+    head = query.lstrip()
+    return head.startswith('{') or head.startswith('query')
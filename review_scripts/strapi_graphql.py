@@ -15,7 +15,14 @@ if not cpath in sys.path:
     sys.path.append(cpath)
 
 from utils.secret import get_auth, lambda_friendly_path
-from api.core.config import get_strapi_params, strapi_stage
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+from review_scripts.strapi_session import get_strapi_session, get_strapi_timeout, send_request
+from review_scripts.rate_limiter import get_rate_limiter
+from review_scripts.circuit_breaker import get_circuit_breaker
+from review_scripts.strapi_errors import error_for_graphql, error_for_status, is_read_document, response_details
+from review_scripts.persisted_queries import persisted, supports_apq, next_apq_step
+from review_scripts.json_codec import JSON_CONTENT_TYPE, decode_response, dumps
+from review_scripts.singleflight import flight_key, get_singleflight
 # import utils.config as config
 
 class StrapiGraphql():
@@ -34,12 +41,27 @@ class StrapiGraphql():
 
         self.ssmkey = ssmkey
         
-        self.token = get_auth(ssmkey,
-                             envvar='STRAPI_TOKEN',
-                             fconfig=lambda_friendly_path(f'.env/{root}.json'))
+        # token and headers are read through get_auth on every use, so a rotated token
+        # reaches this long-lived client; resolved once here so a missing token fails early
+        self._token_source = dict(ssmkey=ssmkey, envvar='STRAPI_TOKEN',
+                                  fconfig=lambda_friendly_path(f'.env/{root}.json'))
+        self.token
+
+        # pooled keep-alive session shared by every client of this stage
+        self.session = get_strapi_session(run_stage)
+        self.timeout = get_strapi_timeout()
+        self.limiter = get_rate_limiter(run_stage)
+        self.breaker = get_circuit_breaker(run_stage)
+
+    @property
+    def token(self):
+        """Current Strapi token: a dict read in get_auth, which refreshes it in the background"""
+        return get_auth(**self._token_source)
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}", "Content-Type": JSON_CONTENT_TYPE}
 
-        self.headers = {"Authorization": f"Bearer {self.token}"}
-      
     
     
     
@@ -48,124 +70,141 @@ class StrapiGraphql():
        
         return get_auth(ssmkey=self.ssmkey, fconfig=f'{cpath}/.env/Strapi_token.json')
         
+    def _send(self, payload, timeout=None, idempotent=False):
+        return send_request(self.session, 'POST', self.apiroot, data=dumps(payload),
+                            headers=self.headers, timeout=timeout or self.timeout,
+                            limiter=self.limiter, breaker=self.breaker,
+                            idempotent=idempotent)
+
+    def _post(self, query, variables=None, timeout=None, raise_errors=True):
+        """
+        Post a graphql document through the pooled session.
+
+        The document is minified and, when the server supports it, first sent
+        as an automatic persisted query (sha256 only); the full text follows
+        only when Strapi does not know the hash yet. Queries are retried on
+        transient failures, mutations only when they never reached Strapi.
+        Identical queries issued concurrently share one call and one result.
+
+        An answer carrying graphql `errors` raises the same typed error as the
+        async client; `raise_errors=False` returns it as is, for callers that
+        read the partial data of aliased mutations row by row.
+
+        Raises:
+            StrapiError: typed by status (transient, conflict, validation)
+                or by the graphql `errors` of a 200 answer
+        """
+        document = persisted(query)
+        if is_read_document(document.text):
+            key = flight_key(self.apiroot, self.token, document.sha256, variables)
+            result = get_singleflight().do(
+                key, lambda: self._execute(document, variables, timeout, True))
+        else:
+            result = self._execute(document, variables, timeout, False)
+        if raise_errors and isinstance(result, dict) and result.get('errors'):
+            raise error_for_graphql(result['errors'], query)
+        return result
+
+    def _execute(self, document, variables, timeout, idempotent):
+        query = document.text
+        payload = {}
+        if variables is not None:
+            payload['variables'] = variables
+
+        use_apq = get_settings().STRAPI_PERSISTED_QUERIES and supports_apq(self.apiroot)
+        if use_apq:
+            request = self._send({**payload, 'extensions': document.extensions}, timeout, idempotent)
+            # server errors and auth failures would repeat with the full text
+            if request.status_code >= 500 or request.status_code in (401, 403):
+                raise error_for_status(request.status_code, response_details(request), query)
+            step = next_apq_step(self.apiroot, request.status_code, response_details(request))
+            if step == 'done':
+                return decode_response(request)
+            if step == 'register':
+                payload['extensions'] = document.extensions
+
+        payload['query'] = document.text
+        request = self._send(payload, timeout, idempotent)
+        if request.status_code != 200:
+            raise error_for_status(request.status_code, response_details(request), query)
+        return decode_response(request)
         
-        
-    def insert_table (self, query, variables):
+    def insert_table (self, query, variables, timeout=None, raise_errors=True):
         """
 
         Args:
             query (String): You can write mutation graphql query to insert 
             variables (stirng ): Values of each attributes needs to be inserted 
+            timeout (float|tuple): optional per-call timeout, defaults to the stage pool timeout
+            raise_errors (bool): raise the typed error of a graphql `errors` answer, default True
 
         Raises:
-            Exception: _description_
+            StrapiError: failed call, or graphql `errors` unless raise_errors is False
 
         Returns:
-            result_json (Json): Response for your request 
+            result_json (dict): Response for your request 
         """
         # use CreateTablename() Mutation query 
         
-        request = requests.post(self.apiroot, json={'query': query, 'variables': variables}, headers=self.headers)
-        if request.status_code == 200:
-            r =  request.json()
-            result_json= json.dumps(r, indent=2)
-            
-        else:
-            raise Exception("Query failed to run by returning code of {}. {}".format(
-                    request.status_code, query))
-        
-        return result_json
+        return self._post(query, variables, timeout=timeout, raise_errors=raise_errors)
     
-    def Select_from_table (self,query, variables):
+    def Select_from_table (self,query, variables, timeout=None, raise_errors=True):
         
         """
 
         Args:
             query (String): You can write query graphql query to select from table
             variables (stirng ): values if you have specific filter 
+            timeout (float|tuple): optional per-call timeout, defaults to the stage pool timeout
+            raise_errors (bool): raise the typed error of a graphql `errors` answer, default True
 
         Raises:
-            Exception: _description_
+            StrapiError: failed call, or graphql `errors` unless raise_errors is False
 
         Returns:
-            result_json (Json): Response for your request 
+            result_json (dict): Response for your request 
         """
         
         # Use query to select from table  
-        if variables ==None:
-            request = requests.post(self.apiroot, json={'query': query}, headers=self.headers)
-            if request.status_code == 200:
-                r =  request.json()
-                # result_json= json.dumps(r, indent=2)
-                
-            else:
-                raise Exception("Query failed to run by returning code of {}. {}".format(
-                        request.status_code, query))
-            
-            return r
-        else:
-            request = requests.post(self.apiroot, json={'query': query, 'variables': variables}, headers=self.headers)
-            if request.status_code == 200:
-                r =  request.json()
-                # result_json= json.dumps(r, indent=2)
-                
-            else:
-                raise Exception("Query failed to run by returning code of {}. {}".format(
-                        request.status_code, query))
-            
-            return r
+        return self._post(query, variables, timeout=timeout, raise_errors=raise_errors)
         
-    def update_table (self, query, variables):
+    def update_table (self, query, variables, timeout=None, raise_errors=True):
         """
 
         Args:
             query (String): You can write mutation graphql query to update 
             variables (stirng ): Values of each attributes needs to be updated
+            timeout (float|tuple): optional per-call timeout, defaults to the stage pool timeout
+            raise_errors (bool): raise the typed error of a graphql `errors` answer, default True
 
         Raises:
-            Exception: _description_
+            StrapiError: failed call, or graphql `errors` unless raise_errors is False
 
         Returns:
-            result_json (Json): Response for your request 
+            result_json (dict): Response for your request 
         """
         # use updateTablename() Mutation query 
         
-        request = requests.post(self.apiroot, json={'query': query, 'variables': variables}, headers=self.headers)
-        if request.status_code == 200:
-            r =  request.json()
-            result_json= json.dumps(r, indent=2)
-            
-        else:
-            raise Exception("Query failed to run by returning code of {}. {}".format(
-                    request.status_code, query))
-        
-        return result_json
+        return self._post(query, variables, timeout=timeout, raise_errors=raise_errors)
     
-    def delete_from_table (self, query, variables):
+    def delete_from_table (self, query, variables, timeout=None, raise_errors=True):
         """
 
         Args:
             query (String): You can write mutation graphql query to delete 
             variables (stirng ): Values of each attributes needs to be deleted
+            timeout (float|tuple): optional per-call timeout, defaults to the stage pool timeout
+            raise_errors (bool): raise the typed error of a graphql `errors` answer, default True
 
         Raises:
-            Exception: _description_
+            StrapiError: failed call, or graphql `errors` unless raise_errors is False
 
         Returns:
-            result_json (Json): Response for your request 
+            result_json (dict): Response for your request 
         """
         # use deleteTablename() Mutation query 
         
-        request = requests.post(self.apiroot, json={'query': query, 'variables': variables}, headers=self.headers)
-        if request.status_code == 200:
-            r =  request.json()
-            result_json= json.dumps(r, indent=2)
-            
-        else:
-            raise Exception("Query failed to run by returning code of {}. {}".format(
-                    request.status_code, query))
-        
-        return result_json
+        return self._post(query, variables, timeout=timeout, raise_errors=raise_errors)
     
     
         
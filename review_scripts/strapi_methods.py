@@ -8,13 +8,19 @@ import numpy as np
 
 # from pathfig import *
 import os, sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 curdir = os.path.dirname(os.path.realpath(__file__))
 cpath = os.path.dirname(curdir)
 print(cpath)
 if not cpath in sys.path:
     sys.path.append(cpath)
 from utils.secret import get_auth, lambda_friendly_path
-from api.core.config import get_strapi_params, strapi_stage
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+from review_scripts.strapi_session import get_strapi_session, get_strapi_timeout, send_request
+from review_scripts.rate_limiter import get_rate_limiter
+from review_scripts.circuit_breaker import get_circuit_breaker
+from review_scripts.json_codec import decode_response, dumps
 
 
 
@@ -35,24 +41,41 @@ class StrapiMethods:
 
         self.ssmkey = ssmkey
         
-        self.token = get_auth(ssmkey,  envvar='STRAPI_TOKEN', fconfig=lambda_friendly_path(f'.env/{root}.json'))
+        # looked up on every use (see StrapiGraphql); resolved here to fail early
+        self._token_source = dict(ssmkey=ssmkey, envvar='STRAPI_TOKEN',
+                                  fconfig=lambda_friendly_path(f'.env/{root}.json'))
+        self.token
 
-        self.headers = {"Authorization": f"Bearer {self.token}"}
+        # pooled keep-alive session shared by every client of this stage
+        self.session = get_strapi_session(run_stage)
+        self.timeout = get_strapi_timeout()
+        self.limiter = get_rate_limiter(run_stage)
+        self.breaker = get_circuit_breaker(run_stage)
+
+    @property
+    def token(self):
+        """Current Strapi token from get_auth's cache"""
+        return get_auth(**self._token_source)
+
+    @property
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
 
 
     def fetch_data(self,table, token):
-        r = requests.get(table,headers = {
+        r = send_request(self.session, 'GET', table, timeout=self.timeout, limiter=self.limiter, breaker=self.breaker, headers = {
 
                         "Authorization": f"Bearer {token}", 
 
                         "Content-Type": "application/json"})
-        return r.json()
+        return decode_response(r)
     
                 
     def update(self,table, id, params, token):
         
-        r = requests.put(table+ str(id),
-        data=json.dumps({
+        r = send_request(self.session, 'PUT', table+ str(id),
+        timeout=self.timeout, limiter=self.limiter, breaker=self.breaker,
+        data=dumps({
            "data":params
         }),
         headers={
@@ -61,25 +84,71 @@ class StrapiMethods:
         })
         
         
-    def insert_data (self,data, table):
-        table = self.apiroot +"/api/"+ table
-        print(table)
-        try:
-            r = requests.post(
+    def _post_record(self, url, data, timeout=None):
+        """POST one record to a REST collection url and return the decoded body"""
+        r = send_request(
+
+            self.session, 'POST', url, 
 
-                table, 
+            timeout=timeout or self.timeout, limiter=self.limiter, breaker=self.breaker,
 
-                data = json.dumps({"data":data}),
-                # self.token['token']
-                headers = {
+            data = dumps({"data":data}),
+            # self.token['token']
+            headers = {
 
-                "Authorization": f"Bearer {self.token}", 
+            "Authorization": f"Bearer {self.token}", 
 
-                "Content-Type": "application/json"}
+            "Content-Type": "application/json"}
 
-            ).json()
+        )
+        return decode_response(r)
+
+    def insert_data (self,data, table, timeout=None):
+        table = self.apiroot +"/api/"+ table
+        print(table)
+        r = None
+        try:
+            r = self._post_record(table, data, timeout)
         except Exception as e:
             print(e)
         return r
+
+    def insert_many(self, table, records, concurrency=None, timeout=None):
+        """
+        Insert records into a REST collection with a bounded worker pool.
+
+        Every insert goes through the pooled session (and the stage rate
+        limiter), so `concurrency` only bounds how many are in flight.
+
+        Args:
+            table (str): collection name, e.g. "trainees"
+            records (list): list of dicts, one per record
+            concurrency (int): parallel inserts, defaults to STRAPI_INSERT_CONCURRENCY
+            timeout (float|tuple): optional per-call timeout
+
+        Returns:
+            list: one Strapi response per record in input order; failed calls
+            are reported as {'data': None, 'error': {'message': ...}}
+        """
+        records = list(records)
+        url = self.apiroot + "/api/" + table
+        concurrency = concurrency or get_settings().STRAPI_INSERT_CONCURRENCY
+
+        def insert(record):
+            try:
+                return self._post_record(url, record, timeout)
+            except Exception as e:
+                return {'data': None, 'error': {'message': str(e)}}
+
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(records) or 1))) as executor:
+            results = list(executor.map(insert, records))
+        elapsed = time.monotonic() - start
+
+        failed = sum(1 for r in results if not isinstance(r, dict) or r.get('error'))
+        rate = len(records) / elapsed if elapsed > 0 else 0.0
+        print(f"insert_many {table}: {len(records) - failed}/{len(records)} inserted "
+              f"in {elapsed:.1f}s ({rate:.1f} records/s, concurrency={concurrency})")
+        return results
     
   
\ No newline at end of file
@@ -0,0 +1,28 @@
+import threading
+
+from review_scripts.strapi_cache import get_strapi_cache
+
+_counters = {}
+_lock = threading.Lock()
+
+
+def incr(name, value=1):
+    """Add `value` to a process-wide Strapi client counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def snapshot():
+    """Copy of every counter, e.g. {'request_bytes_saved': 12345}"""
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def report():
+    """Counters plus the shared Strapi cache's hit / miss stats, for logs and /metrics/strapi"""
+    return {'counters': snapshot(), 'cache': get_strapi_cache().stats()}
@@ -0,0 +1,176 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.core.config import get_settings, get_strapi_params, strapi_stage
+from review_scripts.rate_limiter import THROTTLE_STATUSES, retry_backoff, throttle_delay
+from review_scripts.strapi_errors import StrapiTransientError
+from review_scripts.compression import accept_encoding, compress_body, record_request, record_response, reject_compression
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# server errors worth replaying (429/503 are already retried by the throttle loop)
+RETRY_STATUSES = (500, 502, 504)
+
+
+def _create_session():
+    """Build a keep-alive requests.Session with a sized connection pool"""
+    settings = get_settings()
+    adapter = HTTPAdapter(pool_connections=settings.STRAPI_POOL_CONNECTIONS,
+                          pool_maxsize=settings.STRAPI_POOL_MAXSIZE)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive", "Accept-Encoding": accept_encoding()})
+    return session
+
+
+def get_strapi_session(run_stage=None):
+    """
+    Return the process-wide pooled session for a run_stage.
+
+    Stages that resolve to the same Strapi root share one session, so every
+    StrapiGraphql / StrapiMethods instance of that stage reuses the same
+    keep-alive connections instead of paying a TCP+TLS handshake per call.
+
+    Args:
+        run_stage (str): Strapi stage name, defaults to STRAPI_STAGE
+
+    Returns:
+        requests.Session
+    """
+    root, _ = get_strapi_params(run_stage or strapi_stage)
+    session = _sessions.get(root)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(root)
+            if session is None:
+                session = _create_session()
+                _sessions[root] = session
+    return session
+
+
+def get_strapi_timeout():
+    """(connect, read) timeout tuple used for every Strapi call"""
+    settings = get_settings()
+    return (settings.STRAPI_CONNECT_TIMEOUT, settings.STRAPI_READ_TIMEOUT)
+
+
+def _send_throttled(session, method, url, timeout, limiter, **kwargs):
+    """One call, repeated while Strapi answers 429/503 (Retry-After or backoff)"""
+    retries = get_settings().STRAPI_THROTTLE_RETRIES
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        response = session.request(method, url, timeout=timeout or get_strapi_timeout(), **kwargs)
+        if response.status_code not in THROTTLE_STATUSES or attempt == retries:
+            break
+        delay = throttle_delay(response.headers, attempt)
+        if limiter is not None:
+            limiter.on_throttled(delay)
+        else:
+            time.sleep(delay)
+
+    if limiter is not None and response.status_code not in THROTTLE_STATUSES:
+        limiter.on_success()
+    return response
+
+
+def _send_compressed(session, method, url, timeout, limiter, **kwargs):
+    """
+    One call with the body compressed when it is large enough; a 415 answer
+    disables compression for the host and the call is sent again uncompressed.
+    """
+    body = kwargs.get('data')
+    compressed, encoding = compress_body(url, body)
+    if encoding is None:
+        response = _send_throttled(session, method, url, timeout, limiter, **kwargs)
+    else:
+        headers = {**(kwargs.get('headers') or {}), 'Content-Encoding': encoding}
+        response = _send_throttled(session, method, url, timeout, limiter,
+                                   **{**kwargs, 'data': compressed, 'headers': headers})
+        if response.status_code == 415:
+            reject_compression(url)
+            response = _send_throttled(session, method, url, timeout, limiter, **kwargs)
+        else:
+            record_request(body, compressed)
+
+    record_response(response, int(response.headers.get('Content-Length') or 0))
+    return response
+
+
+def send_request(session, method, url, timeout=None, limiter=None, breaker=None,
+                 idempotent=None, **kwargs):
+    """
+    Send a request through a pooled Strapi session.
+
+    When a limiter is given every attempt first takes a token from it, and
+    429/503 answers are retried after Retry-After (or exponential backoff),
+    pausing every other caller of the stage for the same time. Bodies above
+    STRAPI_COMPRESS_MIN_BYTES are sent compressed until the host answers 415.
+
+    Network errors and 5xx answers are retried with jittered backoff for
+    idempotent calls. Other calls are only replayed when the connection could
+    not be opened, so Strapi never saw them. A breaker, when given, rejects
+    calls while the stage is failing and is told how each call ended.
+
+    Args:
+        session (requests.Session): session from get_strapi_session
+        method (str): HTTP method
+        url (str): full request url
+        timeout (float|tuple): per-call timeout, defaults to the configured one
+        limiter (TokenBucket): stage rate limiter from get_rate_limiter
+        breaker (CircuitBreaker): stage breaker from get_circuit_breaker
+        idempotent (bool): safe to replay, defaults to True for GET/PUT/DELETE
+
+    Raises:
+        StrapiTransientError: network failure after the last attempt
+        StrapiCircuitOpenError: the stage circuit is open
+
+    Returns:
+        requests.Response
+    """
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    attempts = get_settings().STRAPI_RETRY_ATTEMPTS
+    probe = breaker.before_call() if breaker is not None else False
+    try:
+        for attempt in range(attempts + 1):
+            try:
+                response = _send_compressed(session, method, url, timeout, limiter, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = StrapiTransientError(f"Request to {url} failed: {e}")
+                retryable = idempotent or isinstance(e, requests.ConnectTimeout)
+            else:
+                if response.status_code < 500:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return response
+                error = None
+                retryable = idempotent and response.status_code in RETRY_STATUSES
+
+            # stop retrying once other calls have opened the circuit
+            if not retryable or attempt == attempts or (breaker is not None and breaker.is_open):
+                break
+            time.sleep(retry_backoff(attempt))
+    except BaseException:
+        # interrupted or failed locally: not a Strapi failure, but a probe must hand its slot back
+        if probe:
+            breaker.release_probe()
+        raise
+
+    if breaker is not None:
+        breaker.record_failure()
+    if error is not None:
+        raise error
+    return response
+
+def close_strapi_sessions():
+    """Close every pooled session (used on shutdown)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
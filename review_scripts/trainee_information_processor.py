@@ -12,7 +12,7 @@ if not cpath in sys.path:
     sys.path.append(cpath)
 
 #  
-from review_scripts.communication_manager import CommunicationManager
+from review_scripts.communication_manager import CommunicationManager, ROSTER_FIELDS
 from review_scripts.strapi_graphql import StrapiGraphql
 from review_scripts.strapi_methods import StrapiMethods
 from utils.gdrive import gsheet
@@ -150,37 +150,22 @@ class TraineeInformationProcesssor:
     def process_user_and_alluser_insertion(self):
         df = self.prepare_applicants()
         # df = df[81:]
-        # Calculate the number of chunks needed
-        num_chunks = (len(df) + 19) // 20  # This ensures that even the last chunk less than 50 rows is processed
-
-        for chunk in range(num_chunks):
-            # Process each chunk of 50 rows
-            start_index = chunk * 20
-            end_index = start_index + 20
-            df_chunk = df.iloc[start_index:end_index]  # Get the chunk
-
-            for i, row in df_chunk.iterrows():
-                res_dict = {
-                    "name": row['name'],
-                    "email": row['email'],
-                    "role": row['role'],
-                    "batch": row['Batch'],
-                }
-                userId = self.insert_user(res_dict)
-                # if userId == 0:
-                    # continue
-                # res_dict['userId'] = userId
-                # res = self.cm.insert_all_users(self.sg, res_dict)
-                # print(res)
-
-            # Print the chunk processing status
-            print(f"Processed rows {start_index + 1} to {end_index}")
-
-            # If not the last chunk, pause for 5 minutes
-            if chunk < num_chunks - 1:
-                print("Pausing for 5 minutes...")
-                time.sleep(20)
-            
+        # pacing is handled by the shared Strapi rate limiter, which slows
+        # down (and honours Retry-After) only when Strapi pushes back
+        for i, row in df.iterrows():
+            res_dict = {
+                "name": row['name'],
+                "email": row['email'],
+                "role": row['role'],
+                "batch": row['Batch'],
+            }
+            userId = self.insert_user(res_dict)
+            # if userId == 0:
+                # continue
+            # res_dict['userId'] = userId
+            # res = self.cm.insert_all_users(self.sg, res_dict)
+            # print(res)
+
         print("All records have been inserted successfully")
     
 
@@ -201,12 +186,12 @@ class TraineeInformationProcesssor:
       
         batch = int(self.configs.batch)
         req_params = {"batch":batch, "role":self.configs.role}
-        result_json = self.cm.read_all_users(self.sg, req_params)
+        result_json = self.cm.read_all_users(self.sg, req_params, fields=ROSTER_FIELDS)
         df = pd.json_normalize(result_json['data']['allUsers']['data'])
         df.rename(columns={"attributes.name": "name", "attributes.email": "Email",
                     "attributes.Batch": "batches", 'id':'all_user'}, inplace=True)
        
-        df = df.drop(columns=['name'])
+        df = df.drop(columns=['name'], errors='ignore')
         return df
 
     def process_vulnerable_column(self, value):
@@ -234,10 +219,10 @@ class TraineeInformationProcesssor:
 
         ddf.rename(columns={"Date of Birth":"date_of_birth"}, inplace=True) 
 
-        for i, row in ddf.iterrows():
-            print("processing..................", row['email'])
-            res = self.cm.insert_profile_information(self.sg, row)
-            print(res)
+        rows = ddf.to_dict('records')
+        results = self.cm.bulk_insert_profile_information(self.sg, rows)
+        for row, res in zip(rows, results):
+            print("processed..................", row['email'], res)
         # Determine the number of chunks needed
         # num_chunks = (len(ddf) + 49) // 50  # Rounds up to include all records
 
@@ -335,9 +320,8 @@ class TraineeInformationProcesssor:
         # url = f"https://{self.root}.10academy.org/api/trainees"
         url = "trainees"
 
-        for single in json.loads(result):
-            print(single)
-            r= self.sm.insert_data(single,url)
+        results = self.sm.insert_many(url, json.loads(result))
+        for r in results:
             print(r)
 
         print("All records have been inserted successfully")
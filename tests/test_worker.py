@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+os.environ.setdefault('STRAPI_TOKEN', '"test-token"')
+
+from api import worker as worker_module
+from api.core.config import get_settings
+from api.models.trainee import BatchConfig, BatchTraineeCreate
+from api.services.job_queue import SQLiteJobQueue
+from api.services.job_store import SQLiteJobStore
+
+BATCH = BatchTraineeCreate(config=BatchConfig(run_stage='dev', login_url='https://example.org'),
+                           file_content=b"name,email\na,a@example.org\nb,b@example.org\n")
+
+
+def test_lost_lease_cancels_job(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.sqlite3')
+    queue, store = SQLiteJobQueue(path), SQLiteJobStore(path)
+    monkeypatch.setattr(worker_module, 'get_job_queue', lambda: queue)
+    monkeypatch.setattr(worker_module, 'get_job_store', lambda: store)
+    events = []
+
+    class SlowBatchService:
+        def __init__(self, batch_create, job_id=None, attempt=None):
+            self.job_id, self.attempt = job_id, attempt
+
+        async def process_batch_trainees(self):
+            store.start(self.job_id, 2, attempt=self.attempt)
+            store.record_rows(self.job_id, [(1, {'status': 'Success'}, None)], attempt=self.attempt)
+            events.append('started')
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                events.append('cancelled')
+                # a write still in flight when the job is cancelled
+                store.record_rows(self.job_id, [(2, {'status': 'Failed'}, None)], attempt=self.attempt)
+                store.finish(self.job_id, 'failed', 'superseded', attempt=self.attempt)
+                raise
+            return {}
+
+    monkeypatch.setattr(worker_module, 'BatchService', SlowBatchService)
+
+    async def scenario():
+        worker = worker_module.Worker(concurrency=1, poll_interval=0.01)
+        worker.settings = get_settings().model_copy(update={'JOB_LEASE_TIMEOUT': 0.3})
+        store.create_job('job-1')
+        queue.enqueue('job-1', BATCH)
+        job_id, batch_create, attempt = queue.claim(worker.worker_id)
+        await worker.slots.acquire()
+        run = asyncio.create_task(worker._run_job(job_id, batch_create, attempt))
+
+        while 'started' not in events:
+            await asyncio.sleep(0.01)
+        # the lease expires: the job is requeued and another worker starts attempt 2
+        assert queue.requeue_stale(0, 3) == []
+        _, _, second_attempt = queue.claim('other-worker')
+        store.start('job-1', 2, attempt=second_attempt)
+
+        await asyncio.wait_for(run, 2)
+        return second_attempt
+
+    second_attempt = asyncio.run(scenario())
+
+    assert second_attempt == 2
+    assert events == ['started', 'cancelled']
+    job = store.get_job('job-1')
+    assert job['status'] == 'running' and job['attempt'] == 2
+    assert [row['row_num'] for row in store.get_rows('job-1')] == [1]
+    # the other worker still owns the job
+    assert queue.heartbeat('job-1', 'other-worker')
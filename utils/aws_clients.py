@@ -0,0 +1,49 @@
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+# connections per client pool; boto3's default of 10 is below the API's thread pool size
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 50))
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', 5))
+
+_session = None
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_config():
+    return Config(max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                  retries={'max_attempts': AWS_MAX_ATTEMPTS, 'mode': 'standard'},
+                  tcp_keepalive=True)
+
+
+def get_client(service_name, region_name=None):
+    """
+    Shared boto3 client for a service and region, created on first use.
+
+    boto3 clients are thread-safe once built, but building them (and the
+    session) is not, so creation happens under a lock and every caller in
+    the process reuses the same client and its connection pool.
+    """
+    global _session
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                if _session is None:
+                    _session = boto3.session.Session()
+                client = _session.client(service_name, region_name=region_name, config=client_config())
+                _clients[key] = client
+    return client
+
+
+def reset_clients():
+    """Drop the cached session and clients (e.g. after credentials changed)"""
+    global _session
+    with _clients_lock:
+        _clients.clear()
+        _session = None
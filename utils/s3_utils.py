@@ -7,6 +7,8 @@ import pickle
 import os
 from botocore.exceptions import NoCredentialsError
 
+from utils.aws_clients import get_client
+
 
 from utils.tenx_logger import TenxLogger
 logger = TenxLogger(os.path.basename(__file__))
@@ -89,7 +91,7 @@ def upload_file(local_file: str, bucket_name: str, s3_file_name: str):
     Function to upload a file to an S3 bucket
     """
 
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
     try:
         s3_client.upload_file(local_file, bucket_name, s3_file_name)
         print(local_file + " uploaded successfully")
@@ -117,7 +119,7 @@ def list_files(bucket: str, **kwargs):
     contents = []
     
     try:
-        s3 = boto3.client("s3")
+        s3 = get_client("s3")
         # Use the paginator to retrieve the file paths for objects matching the prefix
         paginator = s3.get_paginator('list_objects_v2')
         page_iterator = paginator.paginate(Bucket=bucket, **kwargs)
@@ -150,8 +152,8 @@ def download_file(file_name: str, bucket: str, output: str):
     """
     Function to download a given file from an S3 bucket
     """
-    s3 = boto3.resource("s3")
-    s3.Bucket(bucket).download_file(file_name, output)
+    s3 = get_client("s3")
+    s3.download_file(bucket, file_name, output)
     print(f"{filename} downloaded successfully")
 
     return output
@@ -164,7 +166,7 @@ def get_s3_dataframe(bucket: str, pathlist: "str | list[str]", ext='csv'):
         pathlist = [pathlist]
         
     
-    s3_client = boto3.client("s3")
+    s3_client = get_client("s3")
     
     dflist = []
     for filename in pathlist:
@@ -219,7 +221,7 @@ def upload_dataframe_to_s3(dataframe, bucket_name, file_name):
 
         csv_bytes = csv_buffer.getvalue().encode('utf-8')
 
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
         s3_client.put_object(Bucket=bucket_name, Key=file_name, Body=csv_bytes)
   
         print(f"DataFrame uploaded to S3: {file_name}")
@@ -239,7 +241,7 @@ def read_dataframe_from_s3(bucket_name, file_name):
                                   or None if an error occurred.
     """
     try:
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
 
         response = s3_client.get_object(Bucket=bucket_name, Key=file_name)
         csv_content = response['Body'].read().decode('utf-8')
@@ -263,7 +265,7 @@ def file_exists_in_s3(bucket_name, file_key):
         bool: True if the file exists, False otherwise.
     """
     try:
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
         s3_client.head_object(Bucket=bucket_name, Key=file_key)
         return True
     except Exception as e:
@@ -279,7 +281,7 @@ def upload_file_to_s3(file_data, file_key, bucket_name):
         bucket_name (str): The name of the S3 bucket.
     """
     try:
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
 
         s3_client.put_object(Bucket=bucket_name, Key=file_key, Body=file_data.encode('utf-8'))
 
@@ -299,7 +301,7 @@ def read_text_file_from_s3(file_key, bucket_name):
         str or None: The content of the file as a string, or None if the file doesn't exist or an error occurs.
     """
     try:
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
 
         file_buffer = BytesIO()
         s3_client.download_fileobj(bucket_name, file_key, file_buffer)
@@ -317,7 +319,7 @@ def delete_file_from_s3(bucket_name, file_path):
     Delete a file from an S3 bucket.
     """
     # Initialize S3 client
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
 
     # Delete file from S3
     s3.delete_object(Bucket=bucket_name, Key=file_path)
@@ -6,21 +6,39 @@ import subprocess
 import requests
 import tempfile
 import base64
-import boto3
+import threading
 from botocore.exceptions import ClientError
 
+from utils.aws_clients import get_client
+
 region_name = "us-east-1"
 
-def init_aws_session():
-    # Create a Secrets Manager client
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
+# SECRET_DEBUG=1 prints who resolves which credential and from where
+SECRET_DEBUG = os.environ.get('SECRET_DEBUG', '').lower() in ('1', 'true', 'yes')
+# seconds a resolved credential is served from memory before a background refresh
+SECRET_CACHE_TTL = float(os.environ.get('SECRET_CACHE_TTL', 900))
+
+# (ssmkey, envvar, fconfig, rfile) -> (resolved_at, value)
+_auth_cache = {}
+_auth_cache_lock = threading.Lock()
+_auth_key_locks = {}
+_refreshing = set()
+
+
+def _debug(msg):
+    if SECRET_DEBUG:
+        print(msg)
 
-    return client
+
+def _caller(depth=2):
+    """file:function:line of the code calling into this module (debug output only)"""
+    frame = sys._getframe(depth)
+    caller_filename = os.path.basename(frame.f_code.co_filename)
+    return f'{caller_filename}:{frame.f_code.co_name}:{frame.f_lineno}'
+
+def init_aws_session():
+    # Shared Secrets Manager client (created once per process)
+    return get_client('secretsmanager', region_name=region_name)
 
 
 def create_secret(secret_name, key, value):
@@ -107,7 +125,7 @@ def config_from_string(sdata,fname=None,rfile=False):
         
             os.makedirs(os.path.dirname(fname),exist_ok=True)
 
-            print(f'writing {fname} file ..')
+            _debug(f'writing {fname} file ..')
             #dump it to json file       
             with open(fname, 'w') as f:
                 json.dump(data, f)
@@ -177,13 +195,74 @@ def get_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False):
     fconfig: file name
     rfile: return file object
 
+    Resolved values are kept in memory: a warm lookup is a dict read, and
+    entries older than SECRET_CACHE_TTL are refreshed in a background thread
+    while the previous value keeps being served.
+    '''
+    if SECRET_DEBUG:
+        _debug(f'{_caller()}: get_auth(ssmkey={ssmkey}, envvar={envvar}, fconfig={fconfig})')
+
+    key = (ssmkey, envvar, fconfig, rfile)
+    entry = _auth_cache.get(key)
+    if entry is None:
+        with _auth_key_lock(key):
+            # another thread may have resolved it while we waited
+            entry = _auth_cache.get(key)
+            if entry is None:
+                value = _resolve_auth(ssmkey, envvar, fconfig, rfile)
+                _auth_cache[key] = (time.monotonic(), value)
+                return value
+    if time.monotonic() - entry[0] > SECRET_CACHE_TTL:
+        _refresh_in_background(key)
+    return entry[1]
+
+
+def _auth_key_lock(key):
+    with _auth_cache_lock:
+        return _auth_key_locks.setdefault(key, threading.Lock())
+
+
+def _refresh_in_background(key):
+    with _auth_cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            value = _resolve_auth(*key, refresh=True)
+            _auth_cache[key] = (time.monotonic(), value)
+        except Exception as e:
+            # keep serving the previous value, try again after the next ttl
+            print(f'refreshing credential {key[0] or key[1]} failed: {e}')
+            entry = _auth_cache.get(key)
+            if entry is not None:
+                _auth_cache[key] = (time.monotonic(), entry[1])
+        finally:
+            with _auth_cache_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=refresh, name='secret-refresh', daemon=True).start()
+
+
+def seed_auth(value, ssmkey=None, envvar=None, fconfig=None, rfile=False):
+    """Store an already resolved credential under the key get_auth would use"""
+    _auth_cache[(ssmkey, envvar, fconfig, rfile)] = (time.monotonic(), value)
+
+
+def clear_auth_cache():
+    """Forget every resolved credential (e.g. after rotating secrets)"""
+    with _auth_cache_lock:
+        _auth_cache.clear()
+
+
+def _resolve_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False, refresh=False):
     '''
-    caller_line_number = sys._getframe(1).f_lineno        
-    caller_filename = sys._getframe(1).f_code.co_filename
-    caller_filename = caller_filename.split('/')[-1] if '/' in caller_filename else caller_filename      
-    caller_func_name = sys._getframe(1).f_code.co_name    
-    print(f'{caller_filename}:{caller_func_name}:{caller_line_number}: get_auth(ssmkey={ssmkey}, envvar={envvar}, fconfig={fconfig})')
+    Uncached credential lookup behind get_auth: file, then env, then ssm
 
+    refresh: skip the files written by earlier lookups (they hold the value
+    being refreshed), fetch from env / ssm and write them again
+    '''
     if not fconfig:
         fconfig = '.env/auth_{ssmkey}.json'
 
@@ -191,10 +270,10 @@ def get_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False):
     fconfig = lambda_friendly_path(fconfig)
         
     #pass through multiple alternatives to get credential
-    if fconfig:                    
+    if fconfig and not refresh:
         if os.path.exists(fconfig):
             try:
-                print(f'reading auth from file: {fconfig} ..')        
+                _debug(f'reading auth from file: {fconfig} ..')        
                 with open(fconfig) as json_file:
                     auth = json.load(json_file)
                 return auth
@@ -204,7 +283,7 @@ def get_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False):
     if envvar:            
         if os.environ.get(envvar,'') not in ['','null','None']: 
             try:
-                print(f'Getting {envvar} from environment ..')
+                _debug(f'Getting {envvar} from environment ..')
                 auth = config_from_string(os.environ.get(envvar,''),fname=fconfig, rfile=rfile)
                 #print('auth from env is:',auth)
                 return auth
@@ -239,12 +318,12 @@ def get_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False):
             sname = 'tenx/env/vars'
             rname = lambda_friendly_path('.env/tenx_env_vars.json')
                                          
-            if not os.path.exists(rname):
-                print(f'Getting {sname} from aws secret manager ..')
+            if refresh or not os.path.exists(rname):
+                _debug(f'Getting {sname} from aws secret manager ..')
                 authTemp = get_secret_env(sname)
                 _ = config_from_string(authTemp,fname=rname,rfile=True)
             else:
-                print(f'Getting {sname} from existing file {rname}..')
+                _debug(f'Getting {sname} from existing file {rname}..')
                 with open(rname) as json_file:
                     authTemp = json.load(json_file)
 
@@ -268,16 +347,19 @@ def get_auth(ssmkey=None, envvar=None, fconfig=None, rfile=False):
                     else:
                         #res is string
                         auth = authTemp[res]
+                if refresh and os.path.exists(fconfig):
+                    # replace the copy an earlier lookup left behind
+                    config_from_string(json.dumps(auth),fname=fconfig)
             else:
-                print(f'Getting {ssmkey} from aws secret manager as it can not be found in {sname} ..')
+                _debug(f'Getting {ssmkey} from aws secret manager as it can not be found in {sname} ..')
                 auth = get_secret(ssmkey,fname=fconfig)   
 
             if rfile:
                 if os.path.exists(fconfig):
-                    print(f'Returning {fconfig} from existing file ..')
+                    _debug(f'Returning {fconfig} from existing file ..')
                     return fconfig
                 else:
-                    print(f'Returning {fconfig} by writing to file ..')
+                    _debug(f'Returning {fconfig} by writing to file ..')
                     return config_from_string(auth,fname=fconfig,rfile=rfile)   
             else:             
                 return auth
@@ -298,11 +380,8 @@ def get_google_service_account(ssmkey="gspread/config",
                                 fconfig=".env/gclass_credentials.json",
                                 rfile=True):
     
-    caller_line_number = sys._getframe(1).f_lineno        
-    caller_filename = sys._getframe(1).f_code.co_filename
-    caller_filename = caller_filename.split('/')[-1] if '/' in caller_filename else caller_filename      
-    caller_func_name = sys._getframe(1).f_code.co_name    
-    print(f'{caller_filename}:{caller_func_name}:{caller_line_number} Getting google service account ..')
+    if SECRET_DEBUG:
+        _debug(f'{_caller()} Getting google service account ..')
 
     return get_auth(ssmkey=ssmkey,
                     envvar=envvar,
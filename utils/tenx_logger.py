@@ -2,11 +2,12 @@ import os, sys
 import logging
 from logging.handlers import RotatingFileHandler
 import datetime
-import boto3
 import functools
 from wasabi import Printer  # type: ignore[import]
 from rich.logging import RichHandler
 
+from utils.aws_clients import get_client
+
 
 #https://github.com/explosion/wasabi
 msg = Printer(timestamp=True)
@@ -78,7 +79,7 @@ class TenxLogger(object, metaclass=SingletonType):
         self.msg = msg
 
         # Initialize S3 client
-        self.s3_client = boto3.client('s3')
+        self.s3_client = get_client('s3')
         self.bucket_name = bucket_name
         self.s3_prefix = s3_prefix        
 